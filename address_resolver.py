@@ -0,0 +1,203 @@
+# address_resolver.py
+import logging
+import threading
+import time
+from typing import Optional
+
+import config
+from entities import ResolvedAddresses
+from memory import MemoryManager
+from process_watch import ProcessWatch
+from retry_policy import Backoff, RetryPolicy
+
+
+class AddressResolver:
+    """
+    Background thread that owns the connection to the game: it waits for the process,
+    attaches (and reattaches after it exits), keeps the pointer chains resolved and
+    publishes the result, so none of that ever stalls the tick thread.
+
+    addresses is replaced, never mutated, with an immutable ResolvedAddresses (or None
+    when there is nothing to drive). A single attribute assignment is atomic, so the
+    tick thread reads the latest version without locking and detects an unpublish by
+    identity.
+
+    Failures are retried per subsystem (process, attach, scan, resolve) with exponential
+    backoff. While pointer resolution is backing off, the chain root is probed every poll
+    and a change (e.g. the player spawning) retries at once.
+
+    While the tick thread is idle (set_idle) the resolver polls at idle_poll_interval_s;
+    refresh() wakes it for an immediate check before the tick thread writes again.
+    """
+
+    def __init__(
+        self,
+        mem_manager: MemoryManager,
+        process_watch: ProcessWatch,
+        poll_interval_s: float,
+        retry: Optional[RetryPolicy] = None,
+        idle_poll_interval_s: Optional[float] = None,
+    ):
+        self.mem_manager = mem_manager
+        self.process_watch = process_watch
+        self.poll_interval_s = poll_interval_s
+        self.idle_poll_interval_s = poll_interval_s if idle_poll_interval_s is None else idle_poll_interval_s
+        self.retry = retry or RetryPolicy(config.RETRY_BACKOFF_S, config.RETRY_JITTER)
+        self.addresses: Optional[ResolvedAddresses] = None
+        self._stop = threading.Event()
+        self._reattach = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_full_resolve = 0.0
+        self._idle = False
+        self._wake = threading.Event()  # Cuts the current wait between steps short
+        # Steps started and completed, so refresh() can wait for a step that began after it
+        self._steps = threading.Condition()
+        self._steps_started = 0
+        self._steps_completed = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="AddressResolver", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 10.0):
+        """Stops the thread, waiting for an attach or resolve in progress to finish."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout_s)
+        if thread.is_alive():
+            logging.warning("Address resolver did not stop within %.0f seconds.", timeout_s)
+        self._thread = None
+
+    def request_reattach(self):
+        """Asks the resolver thread to drop the connection and attach again, e.g. after a memory error."""
+        self._reattach.set()
+        self._wake.set()
+
+    def set_idle(self, idle: bool):
+        """Tells the resolver whether the tick thread has anything to drive; while idle it polls at the idle rate."""
+        self._idle = idle
+
+    def refresh(self, timeout_s: float) -> Optional[ResolvedAddresses]:
+        """
+        Wakes the thread for an immediate staleness check and waits (up to timeout_s) for
+        it to finish. Returns the addresses as of that check.
+        """
+        with self._steps:
+            target = self._steps_started + 1
+            self._wake.set()
+            self._steps.wait_for(lambda: self._steps_completed >= target, timeout_s)
+        return self.addresses
+
+    def _poll_interval_s(self) -> float:
+        return self.idle_poll_interval_s if self._idle else self.poll_interval_s
+
+    def _publish(self, addresses: Optional[ResolvedAddresses]):
+        if addresses != self.addresses:
+            self.addresses = addresses
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self._steps:
+                self._steps_started += 1
+            try:
+                delay_s = self._step()
+            except Exception as e:
+                logging.error("Unexpected error in address resolver: %s", e)
+                self._publish(None)
+                delay_s = self.retry["resolve"].failure()
+            with self._steps:
+                self._steps_completed += 1
+                self._steps.notify_all()
+            self._wake.wait(delay_s)
+        self._publish(None)
+
+    def _detach(self):
+        self._publish(None)  # Unpublish first so the tick thread stops using the addresses
+        self.mem_manager.detach()
+        self.process_watch.track(None)
+        self.retry.reset()
+
+    def _failed(self, backoff: Backoff, message: str, probe=None) -> float:
+        """Records a failure of one subsystem and returns how long to wait before the next step."""
+        delay_s = backoff.failure(probe=probe)
+        if backoff.should_log():
+            logging.warning("%s Retrying in %.1f seconds (failure %d)...", message, delay_s, backoff.failures)
+        return delay_s
+
+    def _succeeded(self, backoff: Backoff, message: str, announce: bool = False):
+        """Resets a subsystem's backoff, logging message if it was failing (or always, with announce)."""
+        failures = backoff.failures
+        outage_s = backoff.success()
+        if outage_s is not None:
+            logging.info("%s (after %d failures over %.1f seconds)", message, failures, outage_s)
+        elif announce:
+            logging.info(message)
+
+    def _step(self) -> float:
+        """Runs one round of connection management and resolution; returns the delay before the next."""
+        mem_manager = self.mem_manager
+        retry = self.retry
+
+        # --- Process Connection Management ---
+        if self._reattach.is_set():
+            self._reattach.clear()
+            self._detach()
+
+        if not mem_manager.is_attached():
+            self._publish(None)
+            if not retry["attach"].ready():
+                return retry["attach"].remaining_s()
+            if not mem_manager.wait_for_process(stop_event=self._stop, backoff=retry["process"]):
+                return 0.0
+            if not mem_manager.attach():
+                return self._failed(retry["attach"], "Failed to attach to process.")
+            self._succeeded(retry["attach"], "Attached to process.")
+            self.process_watch.track(mem_manager.process_id)
+            self._last_full_resolve = 0.0
+            if not mem_manager.signatures_resolved():
+                return self._failed(retry["scan"], "Required signatures not found.")
+
+        if not self.process_watch.is_alive():
+            logging.info("Target process has closed.")
+            self._detach()
+            return 0.0
+
+        # --- Signature Scan ---
+        if not mem_manager.signatures_resolved():
+            if not retry["scan"].ready():
+                return min(self._poll_interval_s(), retry["scan"].remaining_s())
+            if not mem_manager.rescan_signatures():
+                return self._failed(retry["scan"], "Required signatures not found.")
+            self._succeeded(retry["scan"], "Found the required signatures.")
+
+        # --- Pointer Resolution ---
+        resolve = retry["resolve"]
+        if resolve.failing:
+            # Backing off: one read of the chain root per poll; a change retries immediately
+            probe = mem_manager.chain_root()
+            if not resolve.ready(probe=probe):
+                return min(self._poll_interval_s(), resolve.remaining_s())
+
+        now = time.perf_counter()
+        # Past the staleness limit every link is re-verified, otherwise only what moved
+        full_resolve = self.addresses is None or now - self._last_full_resolve > config.POINTER_MAX_STALENESS_S
+        if full_resolve or mem_manager.addresses_changed():
+            resolved = mem_manager.resolve_addresses(full=full_resolve)
+            if not resolved:
+                self._publish(None)
+                self._failed(resolve, "Failed to resolve pointers.", probe=mem_manager.chain_root())
+                return min(self._poll_interval_s(), resolve.remaining_s())
+
+            was_unresolved = self.addresses is None
+            self._publish(resolved)
+            if full_resolve:
+                self._last_full_resolve = now
+            self._succeeded(resolve, "Successfully resolved pointers.", announce=was_unresolved)
+        return self._poll_interval_s()
@@ -0,0 +1,296 @@
+# backends.py
+import importlib.util
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+import module_reader
+
+# Windows-only dependencies, imported on first use so that startup and waiting for the
+# game don't pay for them (waiting only needs psutil). Not available off Windows, where
+# only the simulated backend is usable.
+pymem = None
+psutil = None
+win32process = None
+win32gui = None
+pywintypes = None
+
+
+def _load_psutil():
+    global psutil
+    if psutil is None:
+        import psutil
+
+
+def _load_pymem():
+    global pymem, win32process, win32gui, pywintypes
+    if pymem is None:
+        import pymem
+        import pymem.process
+        import pymem.memory
+        import pymem.exception
+        import win32process
+        import win32gui
+        import pywintypes
+
+
+# GetExitCodeProcess result for a process that has not exited
+STILL_ACTIVE = 259
+
+
+# --- Errors ---
+
+
+class MemoryAccessError(Exception):
+    pass
+
+
+class MemoryReadError(MemoryAccessError):
+    pass
+
+
+class MemoryWriteError(MemoryAccessError):
+    pass
+
+
+class ProcessNotFound(Exception):
+    pass
+
+
+@dataclass
+class ModuleInfo:
+    base: int
+    size: int
+
+
+class MemoryBackend(Protocol):
+    """Everything MemoryManager needs from the operating system."""
+
+    def open_process(self, process_name: str) -> int:
+        """Opens the process and returns its PID. Raises ProcessNotFound."""
+        ...
+
+    def close_process(self) -> None: ...
+
+    def read_bytes(self, address: int, size: int) -> bytes:
+        """Raises MemoryReadError."""
+        ...
+
+    def write_bytes(self, address: int, data: bytes) -> None:
+        """Raises MemoryWriteError."""
+        ...
+
+    def query_region(self, address: int) -> tuple[int, int, int, int]:
+        """Returns (region_base, region_size, state, protect) for the region containing address."""
+        ...
+
+    def find_module(self, module_name: str) -> Optional[ModuleInfo]: ...
+
+    def is_process_running(self, process_name: str) -> bool: ...
+
+    def is_process_alive(self, process_id: int) -> bool:
+        """Cheap liveness check for an already known PID."""
+        ...
+
+    def get_foreground_process_pid(self) -> Optional[int]: ...
+
+
+# --- Pymem (Windows) Backend ---
+
+
+class PymemBackend:
+    def __init__(self):
+        # Only check the dependencies are installed; importing them is deferred
+        if any(importlib.util.find_spec(name) is None for name in ("pymem", "psutil", "win32gui")):
+            raise RuntimeError("PymemBackend requires pymem, psutil and pywin32 (Windows only).")
+        self.pm: Optional["pymem.Pymem"] = None
+        # Per process name, (pid, create time) of running processes known not to be it
+        self._other_processes: dict[str, set[tuple[int, float]]] = {}
+
+    def open_process(self, process_name: str) -> int:
+        _load_pymem()
+        try:
+            self.pm = pymem.Pymem(process_name)
+        except pymem.exception.ProcessNotFound as e:
+            raise ProcessNotFound(process_name) from e
+        return self.pm.process_id
+
+    def close_process(self) -> None:
+        if self.pm:
+            try:
+                self.pm.close_process()
+            finally:
+                self.pm = None
+
+    def read_bytes(self, address: int, size: int) -> bytes:
+        try:
+            return self.pm.read_bytes(address, size)
+        except (pymem.exception.MemoryReadError, pymem.exception.WinAPIError, TypeError, ValueError) as e:
+            raise MemoryReadError(f"Could not read {size} bytes at {hex(address)}: {e}") from e
+
+    def write_bytes(self, address: int, data: bytes) -> None:
+        try:
+            self.pm.write_bytes(address, data, len(data))
+        except (pymem.exception.MemoryWriteError, pymem.exception.WinAPIError, TypeError, ValueError) as e:
+            raise MemoryWriteError(f"Could not write {len(data)} bytes at {hex(address)}: {e}") from e
+
+    def query_region(self, address: int) -> tuple[int, int, int, int]:
+        mbi = pymem.memory.virtual_query(self.pm.process_handle, address)
+        return mbi.BaseAddress or address, mbi.RegionSize, mbi.State, mbi.Protect
+
+    def find_module(self, module_name: str) -> Optional[ModuleInfo]:
+        module = pymem.process.module_from_name(self.pm.process_handle, module_name)
+        if not module:
+            return None
+        return ModuleInfo(base=module.lpBaseOfDll, size=module.SizeOfImage)
+
+    def is_process_running(self, process_name: str) -> bool:
+        # Processes already known not to be the game are skipped without a name lookup. They
+        # are keyed by (pid, create time), so a PID reused by the game is looked up again;
+        # process_iter keeps its Process objects between calls, and each caches its create
+        # time, so only processes started since the last call cost system calls.
+        _load_psutil()
+        known = self._other_processes.get(process_name, set())
+        others = set()
+        for p in psutil.process_iter():
+            try:
+                key = (p.pid, p.create_time())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                key = None  # Identity unknown: never cached, so looked up again next call
+            if key is not None and key in known:
+                others.add(key)
+                continue
+            try:
+                if p.name() == process_name:
+                    return True
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+            if key is not None:
+                others.add(key)
+        self._other_processes[process_name] = others
+        return False
+
+    def is_process_alive(self, process_id: int) -> bool:
+        # Called from the watch thread while detach() may clear self.pm; read it once
+        pm = self.pm
+        if not pm or pm.process_id != process_id:
+            _load_psutil()
+            return psutil.pid_exists(process_id)
+        try:
+            return win32process.GetExitCodeProcess(pm.process_handle) == STILL_ACTIVE
+        except (pywintypes.error, AttributeError):
+            return False
+
+    def get_foreground_process_pid(self) -> Optional[int]:
+        _load_pymem()
+        try:
+            hwnd = win32gui.GetForegroundWindow()
+            if not hwnd:
+                return None
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            return pid
+        except (pywintypes.error, OSError, AttributeError):
+            # AttributeError can happen if win32gui functions aren't available
+            logging.warning("Could not get foreground window PID. win32gui might be missing or failed.")
+            return None
+
+
+# --- Simulated Backend ---
+
+
+class SimulatedBackend:
+    """
+    In-process stand-in for a game process: one module image backed by a bytearray.
+
+    Every call is counted in call_counts and can be given an artificial per-call latency,
+    so hot paths can be profiled and regression-tested without Windows or a game client.
+    """
+
+    PAGE_READWRITE = 0x04
+
+    def __init__(self, image_size: int, module_name: str = "Trove.exe", base_address: int = 0x400000, process_id: int = 4242, latency_s: float = 0.0):
+        self.memory = bytearray(image_size)
+        self.module_name = module_name
+        self.base_address = base_address
+        self.process_id = process_id
+        self.latency_s = latency_s
+        self.running = True
+        self.foreground_pid: Optional[int] = process_id
+        # (start, end) address ranges that behave like PAGE_NOACCESS memory
+        self.unreadable: list[tuple[int, int]] = []
+        self.call_counts: Counter = Counter()
+        self._open = False
+
+    def _call(self, name: str):
+        self.call_counts[name] += 1
+        if self.latency_s > 0:
+            deadline = time.perf_counter() + self.latency_s
+            while time.perf_counter() < deadline:
+                pass
+
+    def _offset(self, address: int, size: int) -> Optional[int]:
+        offset = address - self.base_address
+        if not self._open or offset < 0 or offset + size > len(self.memory):
+            return None
+        for start, end in self.unreadable:
+            if address < end and address + size > start:
+                return None
+        return offset
+
+    def open_process(self, process_name: str) -> int:
+        self._call("open_process")
+        if not self.running or process_name != self.module_name:
+            raise ProcessNotFound(process_name)
+        self._open = True
+        return self.process_id
+
+    def close_process(self) -> None:
+        self._call("close_process")
+        self._open = False
+
+    def read_bytes(self, address: int, size: int) -> bytes:
+        self._call("read_bytes")
+        offset = self._offset(address, size)
+        if offset is None:
+            raise MemoryReadError(f"Could not read {size} bytes at {hex(address)}")
+        return bytes(self.memory[offset : offset + size])
+
+    def write_bytes(self, address: int, data: bytes) -> None:
+        self._call("write_bytes")
+        offset = self._offset(address, len(data))
+        if offset is None:
+            raise MemoryWriteError(f"Could not write {len(data)} bytes at {hex(address)}")
+        self.memory[offset : offset + len(data)] = data
+
+    def query_region(self, address: int) -> tuple[int, int, int, int]:
+        self._call("query_region")
+        image_end = self.base_address + len(self.memory)
+        if address < self.base_address or address >= image_end:
+            return address, 0, 0, 0
+        boundaries = [image_end]
+        for start, end in self.unreadable:
+            if start <= address < end:
+                return start, end - start, module_reader.MEM_COMMIT, module_reader.PAGE_NOACCESS
+            if address < start:
+                boundaries.append(start)
+        return address, min(boundaries) - address, module_reader.MEM_COMMIT, self.PAGE_READWRITE
+
+    def find_module(self, module_name: str) -> Optional[ModuleInfo]:
+        self._call("find_module")
+        if module_name != self.module_name:
+            return None
+        return ModuleInfo(base=self.base_address, size=len(self.memory))
+
+    def is_process_running(self, process_name: str) -> bool:
+        self._call("is_process_running")
+        return self.running and process_name == self.module_name
+
+    def is_process_alive(self, process_id: int) -> bool:
+        self._call("is_process_alive")
+        return self.running and process_id == self.process_id
+
+    def get_foreground_process_pid(self) -> Optional[int]:
+        self._call("get_foreground_process_pid")
+        return self.foreground_pid
@@ -0,0 +1,94 @@
+# benchmarks/bench_recovery.py
+"""
+Outage recovery of the address resolver against a simulated process: how long after
+an outage ends the addresses are published again, and how many backend calls the
+resolver spends per second while it lasts.
+
+    process: the game is not running, then starts
+    resolve: the local player pointer is null (e.g. a loading screen), then is set again
+
+Run from the repository root:
+    python -m benchmarks.bench_recovery [--outage-s 3]
+"""
+import argparse
+import random
+import struct
+import time
+
+import config
+import memory
+from address_resolver import AddressResolver
+from benchmarks.harness import isolate_signature_cache, result
+from benchmarks.sim_game import STATIC_POINTER_OFFSET, build_game
+from process_watch import ProcessWatch
+from retry_policy import RetryPolicy
+
+_POLL_S = 0.001
+
+
+def _wait_for(condition, timeout_s: float) -> float:
+    """Seconds until condition() held, polled every millisecond."""
+    started = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - started > timeout_s:
+            raise RuntimeError("Simulated game did not recover.")
+        time.sleep(_POLL_S)
+    return time.perf_counter() - started
+
+
+def _run_outage(scenario: str, outage_s: float) -> list[dict]:
+    game = build_game()
+    backend = game.backend
+    pointer_offset = STATIC_POINTER_OFFSET
+    player = struct.unpack_from("<I", backend.memory, pointer_offset)[0]
+    mem_manager = memory.MemoryManager(config.PROCESS_NAME, backend)
+    process_watch = ProcessWatch(backend, config.PROCESS_LIVENESS_INTERVAL_S, config.FOREGROUND_CHECK_INTERVAL_S)
+    retry = RetryPolicy(config.RETRY_BACKOFF_S, config.RETRY_JITTER, random.Random(0))
+    resolver = AddressResolver(mem_manager, process_watch, config.RESOLVER_POLL_INTERVAL_S, retry)
+
+    process_watch.start()
+    resolver.start()
+    try:
+        if scenario == "process":
+            backend.running = False
+        else:
+            _wait_for(lambda: resolver.addresses is not None, 10.0)
+            struct.pack_into("<I", backend.memory, pointer_offset, 0)
+            _wait_for(lambda: resolver.addresses is None, 10.0)
+
+        calls_before = sum(backend.call_counts.values())
+        time.sleep(outage_s)
+        calls = sum(backend.call_counts.values()) - calls_before
+
+        if scenario == "process":
+            backend.running = True
+        else:
+            struct.pack_into("<I", backend.memory, pointer_offset, player)
+        recovery_s = _wait_for(lambda: resolver.addresses is not None, 10.0)
+    finally:
+        resolver.stop()
+        process_watch.stop()
+        mem_manager.detach()
+
+    name = f"recovery.{scenario}"
+    return [
+        result(f"{name}.latency", "ms", recovery_s * 1000, True),
+        result(f"{name}.outage_calls", "calls_per_s", calls / outage_s, True),
+    ]
+
+
+def run(outage_s: float = 3.0) -> list[dict]:
+    isolate_signature_cache()
+    return _run_outage("process", outage_s) + _run_outage("resolve", outage_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outage-s", type=float, default=3.0, help="How long each outage lasts.")
+    args = parser.parse_args()
+    for entry in run(args.outage_s):
+        print(f"{entry['name']:<36} {entry['value']:10.2f} {entry['metric']}")
+
+
+if __name__ == "__main__":
+    main()
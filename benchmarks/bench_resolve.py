@@ -0,0 +1,49 @@
+# benchmarks/bench_resolve.py
+"""
+Pointer resolution latency against a simulated process with a configurable per-read cost.
+
+Run from the repository root:
+    python -m benchmarks.bench_resolve [--latencies-us 0 5 20 50]
+"""
+import argparse
+
+import config
+import memory
+from benchmarks.harness import isolate_signature_cache, mean_time, result
+from benchmarks.sim_game import build_game
+
+
+def run(latencies_us: list[float], number: int = 200, repeat: int = 3) -> list[dict]:
+    isolate_signature_cache()
+    results = []
+    for latency_us in latencies_us:
+        game = build_game(latency_s=latency_us / 1e6)
+        mem_manager = memory.MemoryManager(config.PROCESS_NAME, game.backend)
+        if not mem_manager.attach() or not mem_manager.resolve_addresses():
+            raise RuntimeError("Simulated game failed to attach or resolve.")
+
+        cases = {
+            "full": lambda: mem_manager.resolve_addresses(full=True),
+            "incremental": lambda: mem_manager.resolve_addresses(),
+            "changed_check": mem_manager.addresses_changed,
+        }
+        for case, fn in cases.items():
+            before = mem_manager.syscalls
+            fn()
+            reads = mem_manager.syscalls - before
+            elapsed = mean_time(fn, number, repeat)
+            results.append(result(f"resolve.{case}.lat{latency_us:g}us", "mean_us", elapsed * 1e6, True, reads=reads))
+        mem_manager.detach()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencies-us", type=float, nargs="+", default=[0, 5, 20, 50], help="Simulated per-read latency.")
+    args = parser.parse_args()
+    for entry in run(args.latencies_us):
+        print(f"{entry['name']:<36} {entry['value']:10.2f} us  ({entry['reads']} reads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# benchmarks/bench_scan.py
+"""
+AOB scanner throughput on synthetic module images.
+
+Run from the repository root:
+    python -m benchmarks.bench_scan [--sizes 50 100 200] [--snapshot Trove.exe.snapshot]
+"""
+import argparse
+import os
+import random
+import time
+
+import config
+import memory
+import module_reader
+import scanner
+from benchmarks.harness import best_time, isolate_signature_cache, result
+from benchmarks.sim_game import build_game
+from module_snapshot import ModuleSnapshot
+from signature_cache import SignatureCache
+
+
+def _legacy_aob_scan(data: bytes, pattern: str, base_address: int = 0) -> list[int]:
+    """The original nested-loop scanner, kept as the reference implementation."""
+    pattern_bytes = scanner.parse_pattern(pattern)
+    results = []
+    for i in range(len(data) - len(pattern_bytes) + 1):
+        match = True
+        for j in range(len(pattern_bytes)):
+            if pattern_bytes[j] is not None and data[i + j] != pattern_bytes[j]:
+                match = False
+                break
+        if match:
+            results.append(base_address + i)
+    return results
+
+
+def _concrete_bytes(pattern: str, rng: random.Random) -> bytes:
+    """Builds a byte string matching the pattern, filling wildcards with random bytes."""
+    return bytes(rng.randrange(256) if b is None else b for b in scanner.parse_pattern(pattern))
+
+
+def make_image(size: int, patterns: list[str], seed: int = 0, plants: int = 4) -> bytearray:
+    """Builds a random image with each pattern planted a few times, the first one near the end."""
+    rng = random.Random(seed)
+    image = bytearray(rng.randbytes(size))
+    for pattern in patterns:
+        for i in range(plants):
+            match = _concrete_bytes(pattern, rng)
+            offset = size - (i + 1) * (size // (plants + 1)) - len(match)
+            image[offset : offset + len(match)] = match
+    return image
+
+
+def check_equivalence(patterns: list[str], size: int = 256 * 1024) -> None:
+    image = bytes(make_image(size, patterns, seed=1))
+    for pattern in patterns:
+        expected = _legacy_aob_scan(image, pattern, 0x400000)
+        actual = scanner.aob_scan(image, pattern, 0x400000)
+        assert actual == expected, f"Scanner mismatch for {pattern!r}"
+        assert scanner.aob_scan(image, pattern, 0x400000, first_only=True) == expected[:1]
+
+
+# Pattern shapes beyond the config signatures: a frequent single byte and a wildcard-led pattern
+EXTRA_PATTERNS = {
+    "single_byte": "E8",
+    "wildcard_led": "?? ?? ?? 8B 40 ?? 85 C0",
+}
+
+
+def run(sizes_mb: list[int], repeat: int = 3, workers_list: list[int] = (1,), chunk_mb: int = 4, verbose: bool = False) -> list[dict]:
+    patterns = {**config.AOB_SIGNATURES, **EXTRA_PATTERNS}
+    signatures = list(memory.SIGNATURES.values())
+    check_equivalence(list(patterns.values()))
+    if verbose:
+        print("Equivalence with the legacy scanner: OK")
+
+    results = []
+
+    def report(name: str, size_mb: int, elapsed: float, **extra):
+        entry = result(name, "mb_per_s", size_mb / elapsed, False, ms=round(elapsed * 1000, 3), **extra)
+        results.append(entry)
+        if verbose:
+            print(f"{name:<44} {elapsed * 1000:8.1f} ms  {entry['value']:8.1f} MB/s")
+
+    for size_mb in sizes_mb:
+        image = bytes(make_image(size_mb * 1024 * 1024, list(patterns.values())))
+        for pattern_name, pattern in patterns.items():
+            for first_only in (False, True):
+                signature = scanner.Signature.compile(pattern_name, pattern)
+                elapsed = best_time(lambda: scanner.aob_scan(image, signature, first_only=first_only), repeat)
+                mode = "first" if first_only else "all"
+                report(f"scan.{pattern_name}.{mode}.{size_mb}mb", size_mb, elapsed)
+        elapsed = best_time(lambda: scanner.scan_signatures(image, signatures, first_only=True), repeat)
+        report(f"scan.signatures.first.{size_mb}mb", size_mb, elapsed)
+
+        overlap = scanner.max_pattern_length(signatures) - 1
+        serial = scanner.scan_signatures(image, signatures)
+        baseline = None
+        for workers in workers_list:
+            effective_workers = min(workers, os.cpu_count() or 1)
+
+            def chunked_scan():
+                chunks = module_reader.iter_buffer_chunks(image, 0, chunk_mb * 1024 * 1024, overlap)
+                return scanner.scan_chunks(chunks, signatures, workers=workers)
+
+            # The first scan starts the shared pool; it is timed on its own and kept out of the scan timings
+            scanner.shutdown_pool()
+            started = time.perf_counter()
+            assert chunked_scan() == serial, f"Chunked scan with {workers} workers differs from the serial scan"
+            first_scan = time.perf_counter() - started
+            elapsed = best_time(chunked_scan, repeat)
+            baseline = baseline or elapsed
+            report(
+                f"scan.chunked.w{workers}.{size_mb}mb", size_mb, elapsed,
+                speedup=round(baseline / elapsed, 2), effective_workers=effective_workers,
+                pool_start_ms=round(max(0.0, first_scan - elapsed) * 1000, 3),
+            )
+        scanner.shutdown_pool()
+        del image
+
+    # End to end: MemoryManager attach (streamed signature scan) against a simulated process
+    isolate_signature_cache()
+    for size_mb in sizes_mb:
+        game = build_game(size_mb * 1024 * 1024)
+        mem_manager = memory.MemoryManager(config.PROCESS_NAME, game.backend)
+
+        def attach(cold: bool):
+            if cold and os.path.exists(config.SIGNATURE_CACHE_FILE):
+                os.remove(config.SIGNATURE_CACHE_FILE)  # Force a full rescan
+            mem_manager._signature_cache = SignatureCache(config.SIGNATURE_CACHE_FILE)
+            assert mem_manager.attach(), "Attach to the simulated process failed"
+            mem_manager.detach()
+
+        report(f"scan.attach.cold.{size_mb}mb", size_mb, best_time(lambda: attach(True), repeat))
+        report(f"scan.attach.cached.{size_mb}mb", size_mb, best_time(lambda: attach(False), repeat))
+
+        # Offline: dump the simulated module to a snapshot and scan it through mmap
+        snapshot_path = os.path.join(os.path.dirname(config.SIGNATURE_CACHE_FILE), f"bench_{size_mb}mb.snapshot")
+        assert mem_manager.attach() and mem_manager.dump_module(snapshot_path), "Dumping the simulated module failed"
+        mem_manager.detach()
+        results.extend(scan_snapshot(snapshot_path, repeat, verbose, f"sim{size_mb}mb"))
+        os.remove(snapshot_path)
+
+    return results
+
+
+def scan_snapshot(path: str, repeat: int = 3, verbose: bool = False, label: str = "file") -> list[dict]:
+    """Times the configured signatures over a module snapshot scanned in place through mmap."""
+    results = []
+    with ModuleSnapshot(path) as snapshot:
+        size_mb = snapshot.size / 2**20
+        for first_only in (False, True):
+            elapsed = best_time(lambda: snapshot.scan(memory.SIGNATURES.values(), first_only), repeat)
+            name = f"scan.snapshot.{'first' if first_only else 'all'}.{label}"
+            results.append(result(name, "mb_per_s", size_mb / elapsed, False, ms=round(elapsed * 1000, 3)))
+            if verbose:
+                print(f"{name:<44} {elapsed * 1000:8.1f} ms  {size_mb / elapsed:8.1f} MB/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200], help="Image sizes in MB.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts for the parallel chunked scan.")
+    parser.add_argument("--chunk-mb", type=int, default=4, help="Chunk (shard) size in MB for the chunked scan.")
+    parser.add_argument("--snapshot", help="Also scan a real module snapshot (python -m module_snapshot dump).")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.workers, args.chunk_mb, verbose=True)
+    if args.snapshot:
+        scan_snapshot(args.snapshot, args.repeat, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_startup.py
+"""
+Startup cost of the entry point: import time of main (from python -X importtime),
+the slowest top-level imports, and a check that the heavy platform modules stay
+deferred until they are needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import result
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that importing main must not load; they are imported on first use
+DEFERRED_MODULES = (
+    "pymem",
+    "psutil",
+    "win32gui",
+    "win32process",
+    "keyboard",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+
+def _python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def import_times(module: str = "main") -> dict[str, tuple[int, int]]:
+    """Runs python -X importtime and returns {module: (self_us, cumulative_us)} for every import."""
+    times = {}
+    for line in _python(f"import {module}", "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if self_us.isdigit():
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def eager_deferred_modules(module: str = "main") -> list[str]:
+    """Returns the DEFERRED_MODULES that importing module loads anyway."""
+    code = f"import sys, {module}; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    return _python(code).stdout.split()
+
+
+def run(repeat: int = 5, top: int = 10, verbose: bool = False) -> list[dict]:
+    best: dict[str, tuple[int, int]] = {}
+    for _ in range(repeat):
+        times = import_times()
+        if "main" not in best or times["main"][1] < best["main"][1]:
+            best = times
+
+    eager = eager_deferred_modules()
+    results = [
+        result("startup.import_main", "ms", best["main"][1] / 1000, True),
+        result("startup.eager_deferred_modules", "count", len(eager), True, modules=eager),
+    ]
+    if verbose:
+        print(f"import main: {best['main'][1] / 1000:.1f} ms (best of {repeat})")
+        print("slowest imports (cumulative):")
+        ranked = sorted(((cumulative, name) for name, (_, cumulative) in best.items() if name != "main"), reverse=True)
+        for cumulative, name in ranked[:top]:
+            print(f"  {name:<32} {cumulative / 1000:7.1f} ms")
+        print(f"deferred modules imported eagerly: {', '.join(eager) or 'none'}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list.")
+    args = parser.parse_args()
+    run(args.repeat, args.top, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
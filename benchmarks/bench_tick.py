@@ -0,0 +1,66 @@
+# benchmarks/bench_tick.py
+"""
+Full-tick cost (staleness check, mode engine tick, noclip update) per registered
+hack mode against a simulated process.
+
+Run from the repository root:
+    python -m benchmarks.bench_tick [--latencies-us 0 5 20 50]
+"""
+import argparse
+
+import config
+import hacks
+import memory
+from benchmarks.harness import isolate_signature_cache, mean_time, result
+from benchmarks.sim_game import build_game
+from entities import InputSnapshot
+from mode_engine import MODES, ModeEngine
+
+INPUTS = {
+    "idle": InputSnapshot(),
+    "moving": InputSnapshot.of("w", "d"),
+    "jumping": InputSnapshot.of("w", "space"),
+}
+
+
+def run(latencies_us: list[float], number: int = 500, repeat: int = 3) -> list[dict]:
+    config.app_config = config.Configuration()
+    isolate_signature_cache()
+    results = []
+    for latency_us in latencies_us:
+        game = build_game(latency_s=latency_us / 1e6)
+        mem_manager = memory.MemoryManager(config.PROCESS_NAME, game.backend)
+        if not mem_manager.attach():
+            raise RuntimeError("Simulated game failed to attach.")
+        addresses = mem_manager.resolve_addresses()
+        engine = ModeEngine(mem_manager)
+
+        for mode in MODES:
+            for input_name, keys in INPUTS.items():
+
+                def tick():
+                    mem_manager.addresses_changed()
+                    snapshot = engine.tick(mode, addresses, keys, config.app_config)
+                    mem_manager.update_noclip_patch(should_be_moving=hacks.is_moving(snapshot))
+
+                before = mem_manager.syscalls
+                tick()
+                tick()  # Second tick: noclip patch state has settled
+                syscalls = (mem_manager.syscalls - before) // 2
+                elapsed = mean_time(tick, number, repeat)
+                name = f"tick.{mode.name.lower()}.{input_name}.lat{latency_us:g}us"
+                results.append(result(name, "mean_us", elapsed * 1e6, True, syscalls=syscalls))
+        mem_manager.detach()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencies-us", type=float, nargs="+", default=[0, 5, 20, 50], help="Simulated per-call latency.")
+    args = parser.parse_args()
+    for entry in run(args.latencies_us):
+        print(f"{entry['name']:<40} {entry['value']:10.2f} us  (~{entry['syscalls']} syscalls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# benchmarks/harness.py
+"""Timing and result helpers shared by the benchmark modules."""
+import os
+import tempfile
+import time
+from typing import Callable
+
+import config
+
+
+def best_time(fn: Callable, repeat: int = 3) -> float:
+    """Best wall time of fn() over repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def mean_time(fn: Callable, number: int, repeat: int = 3) -> float:
+    """Best-of-repeat mean time of one fn() call over number calls, in seconds."""
+    def batch():
+        for _ in range(number):
+            fn()
+
+    return best_time(batch, repeat) / number
+
+
+def result(name: str, metric: str, value: float, lower_is_better: bool, **extra) -> dict:
+    """One machine-readable benchmark result, as written to the JSON report."""
+    return {"name": name, "metric": metric, "value": round(value, 3), "lower_is_better": lower_is_better, **extra}
+
+
+def isolate_signature_cache():
+    """Points the signature cache at a throwaway file so benchmarks never touch the user's cache."""
+    config.SIGNATURE_CACHE_FILE = os.path.join(tempfile.mkdtemp(prefix="trove_bench_"), "signature_cache.json")
@@ -0,0 +1,94 @@
+# benchmarks/run_all.py
+"""
+Runs the scan, resolve, tick, startup and recovery benchmarks and writes the results as JSON.
+
+Run from the repository root:
+    python -m benchmarks.run_all --output results.json
+    python -m benchmarks.run_all --compare baseline.json --threshold 0.15
+
+With --compare the run exits with status 1 if any benchmark regressed by more than
+threshold (a fraction) relative to the baseline report.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks import bench_recovery, bench_resolve, bench_scan, bench_startup, bench_tick
+
+
+def collect(quick: bool, workers: list[int]) -> dict:
+    sizes = [8] if quick else [50, 100]
+    latencies = [0, 20] if quick else [0, 5, 20, 50]
+    number = 50 if quick else 200
+    results = []
+    results += bench_scan.run(sizes, repeat=3, workers_list=workers)
+    results += bench_resolve.run(latencies, number=number)
+    results += bench_tick.run(latencies, number=number)
+    results += bench_startup.run(repeat=3 if quick else 5)
+    results += bench_recovery.run(outage_s=1.0 if quick else 3.0)
+    return {
+        "time": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def find_regressions(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describes every result that is worse than its baseline by more than threshold."""
+    previous = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get(entry["name"])
+        if not old:
+            continue
+        if not old["value"]:
+            # No relative change from zero; any increase of a lower-is-better count is a regression
+            if entry["lower_is_better"] and entry["value"] > 0:
+                regressions.append(f"{entry['name']}: 0 -> {entry['value']} {entry['metric']}")
+            continue
+        change = (entry["value"] - old["value"]) / old["value"]
+        if not entry["lower_is_better"]:
+            change = -change
+        if change > threshold:
+            regressions.append(
+                f"{entry['name']}: {old['value']} -> {entry['value']} {entry['metric']} ({change:+.0%} worse)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout).")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown as a fraction (default 0.15).")
+    parser.add_argument("--quick", action="store_true", help="Small sizes and fewer iterations, for smoke runs.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts for the chunked scan.")
+    args = parser.parse_args()
+
+    report = collect(args.quick, args.workers)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}.")
+
+
+if __name__ == "__main__":
+    main()
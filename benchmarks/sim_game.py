@@ -0,0 +1,88 @@
+# benchmarks/sim_game.py
+"""Builds a simulated Trove process image for benchmarks: PE header, signatures and pointer chains."""
+import random
+import struct
+from dataclasses import dataclass
+
+import config
+import scanner
+from backends import SimulatedBackend
+
+HEADER_SIZE = 0x1000
+STATIC_POINTER_OFFSET = 0x2000  # Where the local player pointer lives, relative to the module base
+HEAP_SIZE = 0x10000  # Pointer chain objects are placed in the last HEAP_SIZE bytes of the image
+
+
+@dataclass
+class SimulatedGame:
+    backend: SimulatedBackend
+    localplayer_match: int  # Absolute address of the LOCALPLAYER_AOB_PATTERN match
+    noclip_match: int  # Absolute address of the NOCLIP_AOB_PATTERN match
+    velocity: int  # Absolute address of the velocity xyz triple
+    camera: int  # Absolute address of the camera xyz triple
+
+
+def _write_pe_header(image: bytearray, code_size: int):
+    e_lfanew = 0x80
+    struct.pack_into("<I", image, 0x3C, e_lfanew)
+    image[e_lfanew : e_lfanew + 4] = b"PE\0\0"
+    optional_header_size = 0xE0
+    struct.pack_into("<HI", image, e_lfanew + 6, 1, 0x5F5E1000)  # NumberOfSections, TimeDateStamp
+    struct.pack_into("<H", image, e_lfanew + 20, optional_header_size)
+    section = e_lfanew + 24 + optional_header_size
+    image[section : section + 8] = b".text\0\0\0"
+    struct.pack_into("<II", image, section + 8, code_size, HEADER_SIZE)  # VirtualSize, VirtualAddress
+    struct.pack_into("<I", image, section + 36, 0x60000020)  # CODE | EXECUTE | READ
+
+
+def _plant(image: bytearray, offset: int, pattern: str, rng: random.Random) -> bytes:
+    match = bytes(rng.randrange(256) if b is None else b for b in scanner.parse_pattern(pattern))
+    image[offset : offset + len(match)] = match
+    return match
+
+
+def build_game(image_size: int = 4 * 1024 * 1024, latency_s: float = 0.0, seed: int = 0) -> SimulatedGame:
+    """
+    Returns a SimulatedBackend whose image contains random code, both config signatures
+    (near the end of the code section, so scans cover most of it) and valid velocity and
+    camera pointer chains. Random code may contain earlier NOCLIP_AOB_PATTERN matches.
+    """
+    rng = random.Random(seed)
+    backend = SimulatedBackend(image_size)
+    base = backend.base_address
+    image = backend.memory
+    code_end = image_size - HEAP_SIZE
+    image[HEADER_SIZE:code_end] = rng.randbytes(code_end - HEADER_SIZE)
+    _write_pe_header(image, code_end - HEADER_SIZE)
+
+    localplayer_offset = code_end - 0x4000
+    _plant(image, localplayer_offset, config.LOCALPLAYER_AOB_PATTERN, rng)
+    struct.pack_into("<I", image, localplayer_offset + 1, base + STATIC_POINTER_OFFSET)
+    noclip_offset = code_end - 0x2000
+    _plant(image, noclip_offset, config.NOCLIP_AOB_PATTERN, rng)
+
+    # Heap objects for the pointer chains, 0x200 bytes apart
+    next_object = [code_end]
+
+    def allocate() -> int:
+        address = base + next_object[0]
+        next_object[0] += 0x200
+        return address
+
+    player = allocate()
+    struct.pack_into("<I", image, STATIC_POINTER_OFFSET, player)
+
+    def build_chain(offsets: list[int]) -> int:
+        current = player
+        for offset in offsets:
+            target = allocate()
+            struct.pack_into("<I", image, current - base + offset, target)
+            current = target
+        return current
+
+    velocity = build_chain(config.VELOCITY_OFFSETS) + config.VELOCITY_VECTOR_OFFSET
+    camera = build_chain(config.CAMERA_OFFSETS) + config.CAMERA_VECTOR_OFFSET
+    struct.pack_into("<3f", image, camera - base, 0.6, -0.2, 0.8)
+
+    backend.latency_s = latency_s
+    return SimulatedGame(backend, base + localplayer_offset, base + noclip_offset, velocity, camera)
@@ -1,23 +1,87 @@
 # config.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, auto
 
 # --- Core Constants ---
 PROCESS_NAME = "Trove.exe"
 INTERVAL_MS = 10
+# The last part of each tick wait is busy-waited for sub-millisecond accuracy (0 disables)
+TICK_SPIN_S = 0.0005
+# Tick rate while idle (hack off, game in background, or no movement input); key presses wake the loop
+IDLE_TICK_RATE_HZ = 10
 ZERO_VERTICAL_VELOCITY = 0.305
+# Cadence of the cached liveness (exit code) and foreground window checks
+PROCESS_LIVENESS_INTERVAL_S = 0.1
+FOREGROUND_CHECK_INTERVAL_S = 0.05
+# How often the resolver thread checks whether the published pointers went stale
+RESOLVER_POLL_INTERVAL_S = INTERVAL_MS / 1000
+# ... and while the tick loop is idle; the tick thread has it re-check before writing again
+RESOLVER_IDLE_POLL_INTERVAL_S = 1.0 / IDLE_TICK_RATE_HZ
+
+# --- Retry ---
+# Exponential backoff (initial_s, max_s) per subsystem after consecutive failures
+RETRY_BACKOFF_S = {
+    "process": (0.25, 1.0),  # Waiting for the game to start
+    "attach": (0.5, 10.0),
+    "scan": (1.0, 30.0),  # Signatures not found, e.g. while the game is still unpacking
+    "resolve": (0.05, 2.0),  # Pointer chains unresolvable, e.g. on the title or loading screen
+}
+# Each delay is randomized by up to this fraction either way
+RETRY_JITTER = 0.2
+
+# --- Profiling ---
+# Opt-in per-phase tick latency histograms; summaries are logged and appended to the dump file
+PROFILING_ENABLED = False
+PROFILING_SUMMARY_INTERVAL_S = 10.0
+PROFILING_DUMP_FILE = "tick_profile.jsonl"
+
+# --- Logging ---
+LOG_FILE = "trove_mod_tool.log"
+# Repeats of a warning/error from the same call site within this window are dropped and counted
+LOG_REPEAT_WINDOW_S = 5.0
 
 # --- Memory Constants ---
 LOCALPLAYER_AOB_PATTERN = "A1 ?? ?? ?? ?? 8B 40 ?? 85 C0 74 ?? 0F 28 ?? ?? EB 07 0F 28 05 ?? ?? ?? ?? 80"
 NOCLIP_AOB_PATTERN = "DC 67 68"
 ORIGINAL_NOCLIP_BYTES = b"\xdc\x67"
 PATCHED_NOCLIP_BYTES = b"\xdc\x47"
-POINTER_RESOLVE_INTERVAL_S = 0.1
+# Pointers are re-resolved when the root or a sentinel chain's last link changes, or at
+# least this often. Only the velocity chain is watched since that is where stale writes land.
+POINTER_MAX_STALENESS_S = 1.0
+POINTER_SENTINEL_CHAINS = ["velocity"]
 VELOCITY_OFFSETS = [0x8, 0x28, 0xC4, 0x4]
 CAMERA_OFFSETS = [0x4, 0x24, 0x84, 0x0]
+# Offsets of the xyz float triples from the end of each pointer chain
+VELOCITY_VECTOR_OFFSET = 0xB0
+CAMERA_VECTOR_OFFSET = 0x100
+# Regions a mode reads that lie within this many bytes of each other are fetched in one read
+READ_COALESCE_GAP = 64
+
+# All signatures resolved at attach time, scanned in a single pass over the module image
+AOB_SIGNATURES = {
+    "localplayer": LOCALPLAYER_AOB_PATTERN,
+    "noclip": NOCLIP_AOB_PATTERN,
+}
+# How each match becomes the value the signature is for (scanner.Extract arguments)
+SIGNATURE_EXTRACTS = {
+    # A1 <imm32>: mov eax, [LocalPlayer], stored relative to the module base
+    "localplayer": {"offset": 1, "read_uint": True, "module_relative": True},
+    # The instruction to patch
+    "noclip": {},
+}
+# Resolved signature offsets are cached per module fingerprint to skip rescans on reattach
+SIGNATURE_CACHE_FILE = "signature_cache.json"
+FINGERPRINT_SAMPLE_PAGES = 8
+# Module images are scanned in chunks of this size to bound memory use
+SCAN_CHUNK_SIZE = 4 * 1024 * 1024
+# Worker processes used to scan chunks in parallel (capped at the CPU count); 1 scans serially
+# on the calling thread. Every chunk is copied to a worker, which costs about as much as
+# scanning it, so more workers only help on many-core hosts with large images.
+SCAN_WORKERS = 1
 
 
 # --- Hack Modes Enum ---
+# Each mode is implemented and registered in hacks.py (see mode_engine.register_mode)
 class HackMode(Enum):
     ACCELBOOST = auto()
     FLY = auto()
@@ -31,6 +95,16 @@ class Configuration:
     accel_boost_speed: float = 40.0
     fly_speed: float = 15.0
     jump_force: float = 25.0
+    # Tick rate per hack mode; modes not listed run at 1000 / INTERVAL_MS
+    tick_rates_hz: dict[HackMode, float] = field(
+        default_factory=lambda: {HackMode.ACCELBOOST: 1000 / INTERVAL_MS, HackMode.FLY: 1000 / INTERVAL_MS}
+    )
+
+    # Modes that may idle while no movement key is held. Fly must keep writing its hover velocity.
+    idle_without_input_modes: set[HackMode] = field(default_factory=lambda: {HackMode.ACCELBOOST})
+
+    def tick_interval_s(self) -> float:
+        return 1.0 / self.tick_rates_hz.get(self.current_hack, 1000 / INTERVAL_MS)
 
 
 app_config: Configuration = None  # Global app config, set in main.py
@@ -1,26 +1,82 @@
 # entities.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
+# Movement keys tracked by the input state table, in bit order
+MOVEMENT_KEYS = ("w", "a", "s", "d", "space", "shift", "<")
+KEY_BITS = {key: 1 << i for i, key in enumerate(MOVEMENT_KEYS)}
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ResolvedAddresses:
-    velocity_x: int = 0
-    velocity_y: int = 0
-    velocity_z: int = 0
-    camera_x: int = 0
-    camera_y: int = 0
-    camera_z: int = 0
+    # Base addresses of contiguous xyz float triples
+    velocity: int = 0
+    camera: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class MovementVector:
     x: float = 0.0
     y: float = 0.0
     z: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class CameraPerspective:
     x: float = 0.0
     y: float = 0.0
     z: float = 0.0
+
+
+@dataclass(slots=True)
+class TickSnapshot:
+    """Game state read once per tick and shared by the hack logic and the noclip check.
+    Writes made during the tick are mirrored here so nothing is read back from the process.
+
+    One snapshot is reused for every tick: velocity and camera point at preallocated
+    vectors that are refilled in place (or are None when their read failed), and
+    movement is scratch space for the velocity a hack computes."""
+
+    velocity: Optional[MovementVector] = None
+    camera: Optional[CameraPerspective] = None
+    movement: MovementVector = field(default_factory=MovementVector)
+    _velocity_buffer: MovementVector = field(default_factory=MovementVector, repr=False)
+    _camera_buffer: CameraPerspective = field(default_factory=CameraPerspective, repr=False)
+
+    def clear(self):
+        self.velocity = None
+        self.camera = None
+
+    def set_velocity(self, x: float, y: float, z: float):
+        velocity = self._velocity_buffer
+        velocity.x = x
+        velocity.y = y
+        velocity.z = z
+        self.velocity = velocity
+
+    def set_camera(self, x: float, y: float, z: float):
+        camera = self._camera_buffer
+        camera.x = x
+        camera.y = y
+        camera.z = z
+        self.camera = camera
+
+
+@dataclass(frozen=True, slots=True)
+class InputSnapshot:
+    """Movement keys held at the start of a tick, as a bitmask over MOVEMENT_KEYS."""
+
+    keys: int = 0
+
+    @classmethod
+    def of(cls, *keys: str) -> "InputSnapshot":
+        mask = 0
+        for key in keys:
+            mask |= KEY_BITS[key]
+        return cls(mask)
+
+    def is_pressed(self, key: str) -> bool:
+        return bool(self.keys & KEY_BITS[key])
+
+    def any(self) -> bool:
+        return self.keys != 0
@@ -1,29 +1,26 @@
 # hacks.py
-import keyboard
 import math
 from typing import Optional
 
 import config
-from memory import MemoryManager
-from entities import ResolvedAddresses, MovementVector, CameraPerspective
+from config import HackMode
+from entities import MovementVector, CameraPerspective, TickSnapshot, InputSnapshot
+from mode_engine import WriteLayout, register_mode, write_layout
 
+# Velocity above this on any axis counts as moving (ignores float drift)
+MOVING_THRESHOLD = 0.1
 
-def _get_camera_perspective(mem_manager: MemoryManager, addresses: ResolvedAddresses) -> Optional[CameraPerspective]:
-    """Reads camera perspective values from memory."""
-    if not addresses:
-        return None
-    x_per = mem_manager.read_float(addresses.camera_x)
-    y_per = mem_manager.read_float(addresses.camera_y)
-    z_per = mem_manager.read_float(addresses.camera_z)
-
-    if x_per is None or y_per is None or z_per is None:
-        return None
-    return CameraPerspective(x=x_per, y=y_per, z=z_per)
+# What each mode writes from snapshot.movement, laid out once instead of every tick
+WRITE_VELOCITY = write_layout("velocity", "x", "y", "z")
+# Horizontal only, leaving the game's Y velocity (gravity) untouched
+WRITE_VELOCITY_XZ = write_layout("velocity", "x", "z")
 
 
-def _calculate_horizontal_movement(cam_perspective: CameraPerspective, speed: float) -> MovementVector:
-    """Calculates desired XZ movement based on camera and WASD keys."""
-    move = MovementVector()
+def _calculate_horizontal_movement(cam_perspective: CameraPerspective, speed: float, keys: InputSnapshot, move: MovementVector) -> MovementVector:
+    """Calculates desired XZ movement based on camera and WASD keys into move (Y is zeroed)."""
+    move.x = 0.0
+    move.y = 0.0
+    move.z = 0.0
 
     hrz_magnitude_sq = cam_perspective.x * cam_perspective.x + cam_perspective.z * cam_perspective.z
     if hrz_magnitude_sq > 1e-9:  # Avoid division by zero or near-zero
@@ -34,16 +31,16 @@ def _calculate_horizontal_movement(cam_perspective: CameraPerspective, speed: fl
         x_norm = 1.0
         z_norm = 0.0
 
-    if keyboard.is_pressed("w"):
+    if keys.is_pressed("w"):
         move.x += x_norm
         move.z += z_norm
-    if keyboard.is_pressed("s"):
+    if keys.is_pressed("s"):
         move.x -= x_norm
         move.z -= z_norm
-    if keyboard.is_pressed("a"):
+    if keys.is_pressed("a"):
         move.x += z_norm
         move.z -= x_norm
-    if keyboard.is_pressed("d"):
+    if keys.is_pressed("d"):
         move.x -= z_norm
         move.z += x_norm
 
@@ -59,41 +56,46 @@ def _calculate_horizontal_movement(cam_perspective: CameraPerspective, speed: fl
     return move
 
 
-def apply_accelboost(mem_manager: MemoryManager, addresses: ResolvedAddresses):
-    cfg = config.app_config
-    cam_perspective = _get_camera_perspective(mem_manager, addresses)
+@register_mode(HackMode.ACCELBOOST, reads=("camera", "velocity"), writes=("velocity",), speed_attr="accel_boost_speed", label="AccelBoost")
+def accelboost(snapshot: TickSnapshot, keys: InputSnapshot, cfg: config.Configuration) -> Optional[WriteLayout]:
+    cam_perspective = snapshot.camera
     if not cam_perspective:
-        return
+        return None
 
-    movement = _calculate_horizontal_movement(cam_perspective, cfg.accel_boost_speed)
+    movement = _calculate_horizontal_movement(cam_perspective, cfg.accel_boost_speed, keys, snapshot.movement)
 
-    if keyboard.is_pressed("space"):
+    if keys.is_pressed("space"):
         movement.y = cfg.jump_force
-    elif keyboard.is_pressed("shift"):
+    elif keys.is_pressed("shift"):
         movement.y = config.ZERO_VERTICAL_VELOCITY
 
-    mem_manager.write_float(addresses.velocity_x, movement.x)
-    mem_manager.write_float(addresses.velocity_z, movement.z)
-    if keyboard.is_pressed("space") or keyboard.is_pressed("shift"):
-        mem_manager.write_float(addresses.velocity_y, movement.y)
+    if keys.is_pressed("space") or keys.is_pressed("shift"):
+        return WRITE_VELOCITY
+    return WRITE_VELOCITY_XZ
 
 
-def apply_fly(mem_manager: MemoryManager, addresses: ResolvedAddresses):
-    cfg = config.app_config
-    cam_perspective = _get_camera_perspective(mem_manager, addresses)
+@register_mode(HackMode.FLY, reads=("camera",), writes=("velocity",), full_writes=True, speed_attr="fly_speed")
+def fly(snapshot: TickSnapshot, keys: InputSnapshot, cfg: config.Configuration) -> Optional[WriteLayout]:
+    cam_perspective = snapshot.camera
     if not cam_perspective:
-        return
+        return None
 
-    movement = _calculate_horizontal_movement(cam_perspective, cfg.fly_speed)
+    movement = _calculate_horizontal_movement(cam_perspective, cfg.fly_speed, keys, snapshot.movement)
 
-    if keyboard.is_pressed("space"):
+    if keys.is_pressed("space"):
         movement.y = cfg.fly_speed
-    elif keyboard.is_pressed("<"):
+    elif keys.is_pressed("<"):
         movement.y = -cfg.fly_speed
     else:
         # Set Y velocity to near zero to counteract gravity when flying horizontally
         movement.y = config.ZERO_VERTICAL_VELOCITY
 
-    mem_manager.write_float(addresses.velocity_x, movement.x)
-    mem_manager.write_float(addresses.velocity_z, movement.z)
-    mem_manager.write_float(addresses.velocity_y, movement.y)
+    return WRITE_VELOCITY
+
+
+def is_moving(snapshot: TickSnapshot) -> bool:
+    """Check if the player has significant velocity, as of the latest read or write this tick."""
+    velocity = snapshot.velocity
+    if velocity is None:
+        return False  # Assume not moving if the read failed
+    return abs(velocity.x) > MOVING_THRESHOLD or abs(velocity.y) > MOVING_THRESHOLD or abs(velocity.z) > MOVING_THRESHOLD
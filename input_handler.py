@@ -1,50 +1,89 @@
 # input_handler.py
-import keyboard
 import config
 import logging
+import mode_engine
+import threading
+
+from entities import MOVEMENT_KEYS, KEY_BITS, InputSnapshot
+
+# Set on any key press so an idling tick loop can wake up immediately
+input_event = threading.Event()
+_key_hook = None
+# Imported by setup_hotkeys(): importing keyboard is slow and not needed before the hooks go in
+keyboard = None
+
+# Bitmask of held movement keys. Only the keyboard hook thread writes it; the tick
+# loop reads it once per tick without locking (a single int read is atomic).
+_key_state: int = 0
+_scan_code_bits: dict[int, int] = {}
+
+
+def _build_scan_code_bits() -> dict[int, int]:
+    # Match on scan codes rather than names, which change with modifiers (e.g. "W" with shift)
+    scan_code_bits = {}
+    for key in MOVEMENT_KEYS:
+        try:
+            for scan_code in keyboard.key_to_scan_codes(key):
+                scan_code_bits[scan_code] = scan_code_bits.get(scan_code, 0) | KEY_BITS[key]
+        except ValueError:
+            logging.warning("Key '%s' is not available on this keyboard layout.", key)
+    return scan_code_bits
+
+
+def _on_key_event(event):
+    global _key_state
+    bit = _scan_code_bits.get(event.scan_code, 0)
+    if event.event_type == keyboard.KEY_DOWN:
+        _key_state |= bit
+        input_event.set()
+    elif bit:
+        _key_state &= ~bit
+
+
+def snapshot_keys() -> InputSnapshot:
+    """Returns the movement keys held right now as an immutable per-tick snapshot."""
+    return InputSnapshot(_key_state)
 
 
 def toggle_hack():
     config.app_config.hack_on = not config.app_config.hack_on
     status = "ON" if config.app_config.hack_on else "OFF"
-    logging.info(f"Hack toggled to {status}")
+    logging.info("Hack toggled to %s", status)
 
 
 def change_mode():
     cfg = config.app_config
-    if cfg.current_hack == config.HackMode.ACCELBOOST:
-        cfg.current_hack = config.HackMode.FLY
-    elif cfg.current_hack == config.HackMode.FLY:
-        cfg.current_hack = config.HackMode.ACCELBOOST
-    else:
-        cfg.current_hack = config.HackMode.ACCELBOOST
+    cfg.current_hack = mode_engine.next_mode(cfg.current_hack)
+    logging.info("Hack mode changed to %s", cfg.current_hack.name)
 
-    logging.info(f"Hack mode changed to {cfg.current_hack.name}")
+
+def _adjust_speed(delta: float):
+    cfg = config.app_config
+    spec = mode_engine.MODES.get(cfg.current_hack)
+    if spec is None or spec.speed_attr is None:
+        return
+    # Prevent speeds from going below a reasonable minimum (e.g., 0 or 5)
+    min_speed = 5.0
+    speed = max(min_speed, getattr(cfg, spec.speed_attr) + delta)
+    setattr(cfg, spec.speed_attr, speed)
+    direction = "increased" if delta > 0 else "decreased"
+    logging.info("%s speed %s to %.1f", spec.label, direction, speed)
 
 
 def increase_speed():
-    cfg = config.app_config
-    if cfg.current_hack == config.HackMode.ACCELBOOST:
-        cfg.accel_boost_speed += 5.0
-        logging.info(f"AccelBoost speed increased to {cfg.accel_boost_speed:.1f}")
-    elif cfg.current_hack == config.HackMode.FLY:
-        cfg.fly_speed += 5.0
-        logging.info(f"Fly speed increased to {cfg.fly_speed:.1f}")
+    _adjust_speed(5.0)
 
 
 def decrease_speed():
-    cfg = config.app_config
-    # Prevent speeds from going below a reasonable minimum (e.g., 0 or 5)
-    min_speed = 5.0
-    if cfg.current_hack == config.HackMode.ACCELBOOST:
-        cfg.accel_boost_speed = max(min_speed, cfg.accel_boost_speed - 5.0)
-        logging.info(f"AccelBoost speed decreased to {cfg.accel_boost_speed:.1f}")
-    elif cfg.current_hack == config.HackMode.FLY:
-        cfg.fly_speed = max(min_speed, cfg.fly_speed - 5.0)
-        logging.info(f"Fly speed decreased to {cfg.fly_speed:.1f}")
+    _adjust_speed(-5.0)
 
 
 def setup_hotkeys():
+    global keyboard, _key_hook, _scan_code_bits
+    import keyboard
+
+    _scan_code_bits = _build_scan_code_bits()
+    _key_hook = keyboard.hook(_on_key_event)
     keyboard.add_hotkey("F3", toggle_hack)
     keyboard.add_hotkey("F4", change_mode)
     keyboard.add_hotkey("page up", increase_speed)
@@ -52,7 +91,13 @@ def setup_hotkeys():
 
 
 def remove_hotkeys():
+    global _key_hook
+    if keyboard is None:
+        return  # Hotkeys were never set up
     try:
+        if _key_hook is not None:
+            keyboard.unhook(_key_hook)
+            _key_hook = None
         keyboard.remove_hotkey("F3")
         keyboard.remove_hotkey("F4")
         keyboard.remove_hotkey("page up")
@@ -62,4 +107,4 @@ def remove_hotkeys():
         # This can happen if hotkeys were somehow not registered
         logging.warning("Could not remove all hotkeys (might have been cleared already).")
     except Exception as e:
-        logging.error(f"Error removing hotkeys: {e}")
+        logging.error("Error removing hotkeys: %s", e)
@@ -0,0 +1,103 @@
+# log_pipeline.py
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Optional
+
+LOG_FORMAT = "[%(levelname)s] %(message)s"
+# Records of this logger are JSON lines for the profile dump file, not log messages
+PROFILE_LOGGER = "profile"
+
+
+class _ExcludeLogger(logging.Filter):
+    """Drops the records of one logger (and its children) that logging.Filter(name) would pass."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not super().filter(record)
+
+
+class RepeatFilter(logging.Filter):
+    """
+    Rate-limits repeated warnings and errors: after a record from a call site passes,
+    further records from the same site (same file, line and message template) are
+    dropped for window_s. The next one to pass after the window reports how many
+    were dropped. Records below min_level always pass.
+    """
+
+    def __init__(self, window_s: float, min_level: int = logging.WARNING):
+        super().__init__()
+        self.window_s = window_s
+        self.min_level = min_level
+        self._sites: dict[tuple, list] = {}  # site -> [window start, suppressed count]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        site = (record.pathname, record.lineno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                self._sites[site] = [now, 0]
+                return True
+            if now - state[0] < self.window_s:
+                state[1] += 1
+                return False
+            suppressed = state[1]
+            state[0] = now
+            state[1] = 0
+        if suppressed:
+            record.msg = f"{record.msg} (repeated %d more times in the last %.0fs)"
+            record.args = (*(record.args or ()), suppressed, self.window_s)
+        return True
+
+
+def start_logging(
+    log_file: str, repeat_window_s: float, level: int = logging.INFO, profile_file: Optional[str] = None
+) -> logging.handlers.QueueListener:
+    """
+    Routes the root logger through a queue so the calling thread never blocks on file or
+    console I/O; a QueueListener thread writes to log_file and stdout, and appends the
+    PROFILE_LOGGER lines to profile_file (or drops them without one). Returns the started
+    listener, which must be stopped on exit to flush pending records.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    console_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+        handler.addFilter(_ExcludeLogger(PROFILE_LOGGER))
+    handlers = [file_handler, console_handler]
+    if profile_file:
+        profile_handler = logging.FileHandler(profile_file, encoding="utf-8", delay=True)
+        profile_handler.setFormatter(logging.Formatter("%(message)s"))
+        profile_handler.addFilter(logging.Filter(PROFILE_LOGGER))
+        handlers.append(profile_handler)
+    # Dump lines are written whatever the root level is
+    logging.getLogger(PROFILE_LOGGER).setLevel(logging.INFO)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatFilter(repeat_window_s))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: logging.handlers.QueueListener):
+    """Drains the queue and closes the output handlers."""
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
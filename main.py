@@ -1,30 +1,40 @@
 # main.py
-import time
-import pymem
-import sys
 import logging
 
 import config
+import log_pipeline
 import memory
+from backends import MemoryReadError, MemoryWriteError
+from address_resolver import AddressResolver
+from mode_engine import ModeEngine
+from process_watch import ProcessWatch
+from scheduler import TickScheduler
 import input_handler
 import hacks
-from entities import ResolvedAddresses
+import profiling
 
 
 def run():
     mem_manager = memory.MemoryManager(config.PROCESS_NAME)
-    current_addresses: ResolvedAddresses | None = None
-    last_resolve_time = 0
+    process_watch = ProcessWatch(mem_manager.backend, config.PROCESS_LIVENESS_INTERVAL_S, config.FOREGROUND_CHECK_INTERVAL_S)
+    # Attaching, liveness and pointer resolution run on background threads; this thread
+    # only reads their published state and does the per-tick reads and writes
+    resolver = AddressResolver(
+        mem_manager, process_watch, config.RESOLVER_POLL_INTERVAL_S, idle_poll_interval_s=config.RESOLVER_IDLE_POLL_INTERVAL_S
+    )
+    engine = ModeEngine(mem_manager)  # Runs the registered hack modes (see hacks.py)
 
     config.app_config = config.Configuration()  # Initialize config
-    pointerResolutionFailed: bool = True
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format="[%(levelname)s] %(message)s",
-        handlers=[logging.FileHandler("trove_mod_tool.log"), logging.StreamHandler(sys.stdout)],
-        force=True,
-        encoding="utf-8",
+    scheduler = TickScheduler(config.app_config.tick_interval_s(), config.TICK_SPIN_S)
+    if config.PROFILING_ENABLED:
+        profiler = profiling.TickProfiler(config.PROFILING_SUMMARY_INTERVAL_S, dump=True)
+    else:
+        profiler = profiling.NullProfiler()
+
+    # Records are handed to a background writer thread so the tick never blocks on log I/O
+    log_listener = log_pipeline.start_logging(
+        config.LOG_FILE, config.LOG_REPEAT_WINDOW_S,
+        profile_file=config.PROFILING_DUMP_FILE if config.PROFILING_ENABLED else None,
     )
 
     logging.info("--==* Trove Modification Tool *==--")
@@ -35,80 +45,78 @@ def run():
     logging.info("--===============================--")
 
     try:
+        # Start waiting for the game first; the keyboard hooks can go in meanwhile
+        process_watch.start()
+        resolver.start()
         input_handler.setup_hotkeys()
 
+        was_idle = True
         while True:
-            # --- Process Connection Management ---
-            if not mem_manager.is_attached():
-                memory.wait_for_process(config.PROCESS_NAME)
-                if not mem_manager.attach():
-                    logging.warning("Failed to attach to process. Retrying in 5 seconds...")
-                    time.sleep(5)
-                    continue  # Retry attaching
-                # Reset state on successful attach/reattach
-                current_addresses = None
-                last_resolve_time = 0
-
-            # Check if process is still running
-            if not memory.is_process_running(config.PROCESS_NAME):
-                logging.info("Target process has closed.")
-                mem_manager.detach()
-                continue  # Go back to waiting for process
-
-            # --- Pointer Resolution ---
-            current_time = time.time()
-            if not current_addresses or (current_time - last_resolve_time > config.POINTER_RESOLVE_INTERVAL_S):
-                resolved = mem_manager.resolve_addresses()
-
-                if not resolved:
-                    pointerResolutionFailed = True
-                    current_addresses = None
-                    logging.warning("Failed to resolve pointers. Retrying...")
-                    time.sleep(1)
-                    continue
-
-                current_addresses = resolved
-                last_resolve_time = current_time
-                if pointerResolutionFailed:
-                    pointerResolutionFailed = False
-                    logging.info("Successfully resolved pointers.")
+            profiler.begin_tick()
+            # --- Published State ---
+            addresses = resolver.addresses  # Latest version published by the resolver thread
+            cfg = config.app_config
+            is_target_active = bool(cfg.hack_on and addresses) and process_watch.is_foreground()
+            if is_target_active and was_idle:
+                # The resolver polled at the idle rate; have it re-verify the pointers before writing
+                addresses = resolver.refresh(cfg.tick_interval_s())
+                is_target_active = addresses is not None
+            keys = input_handler.snapshot_keys()
+            profiler.lap("state")
 
             # --- Hack Application Logic ---
-            if config.app_config.hack_on and current_addresses:
-                foreground_pid = memory.get_foreground_process_pid()
-                is_target_active = foreground_pid is not None and foreground_pid == mem_manager.process_id
-
-                if is_target_active:
-                    try:
-                        if config.app_config.current_hack == config.HackMode.ACCELBOOST:
-                            hacks.apply_accelboost(mem_manager, current_addresses)
-                        elif config.app_config.current_hack == config.HackMode.FLY:
-                            hacks.apply_fly(mem_manager, current_addresses)
-
-                        # --- Noclip Bypass Logic ---
-                        is_actively_moving = mem_manager.is_moving(current_addresses)
-                        mem_manager.update_noclip_patch(should_be_moving=is_actively_moving)
-
-                    except (pymem.exception.MemoryReadError, pymem.exception.MemoryWriteError) as e:
-                        logging.error(f"Memory access error during hack loop: {e}. Detaching...")
-                        mem_manager.detach()  # Detach on critical memory error
-                        current_addresses = None  # Force re-resolve after reattach
-                    except Exception as e:
-                        logging.error(f"Unexpected error in hack loop: {e}")
+            if is_target_active:
+                try:
+                    with mem_manager.lock:
+                        # Skip the tick if the addresses were unpublished (e.g. detached) meanwhile
+                        if resolver.addresses is addresses:
+                            snapshot = engine.tick(cfg.current_hack, addresses, keys, cfg)
+                            profiler.lap("hack")
+
+                            # --- Noclip Bypass Logic ---
+                            is_actively_moving = hacks.is_moving(snapshot)
+                            mem_manager.update_noclip_patch(should_be_moving=is_actively_moving)
+                            profiler.lap("noclip")
+
+                except (MemoryReadError, MemoryWriteError) as e:
+                    logging.error("Memory access error during hack loop: %s. Reattaching...", e)
+                    resolver.request_reattach()  # Detach and reattach on the resolver thread
+                except Exception as e:
+                    logging.error("Unexpected error in hack loop: %s", e)
+
+            profiler.end_tick(mem_manager.syscalls)
 
             # --- Loop Timing ---
-            time.sleep(config.INTERVAL_MS / 1000.0)
+            # Idle at a low rate (woken by any key press) when there is nothing to drive
+            is_idle = not is_target_active or (
+                cfg.current_hack in cfg.idle_without_input_modes and not keys.any()
+            )
+            resolver.set_idle(is_idle)
+            was_idle = is_idle
+            if is_idle:
+                scheduler.set_interval(1.0 / config.IDLE_TICK_RATE_HZ)
+                scheduler.wait(input_handler.input_event)
+            else:
+                scheduler.set_interval(cfg.tick_interval_s())
+                scheduler.wait()
+            profiler.lap("sleep")
 
     except KeyboardInterrupt:
         logging.info("\nCtrl+C detected. Exiting...")
     except Exception as e:
-        logging.error(f"\nAn unhandled exception occurred: {e}")
+        logging.error("\nAn unhandled exception occurred: %s", e)
     finally:
         logging.info("Cleaning up...")
+        logging.info("Tick stats: %s", scheduler.stats.summary())
+        logging.info("Mode costs: %s", engine.cost_summary())
+        logging.info("Retry failures: %s", resolver.retry.summary())
         input_handler.remove_hotkeys()
-        if mem_manager.is_attached():
-            mem_manager.detach()
+        # Stop the background threads before detaching so nothing reattaches afterwards
+        resolver.stop()
+        process_watch.stop()
+        mem_manager.detach()  # Restores patched bytes
         logging.info("Exited.")
+        log_pipeline.stop_logging(log_listener)
 
 
 if __name__ == "__main__":
@@ -1,240 +1,333 @@
 # memory.py
-import pymem
-import pymem.process
-import pymem.pattern
-import pymem.exception
-import psutil
-import re
+import struct
+import threading
 import time
-import win32process
-import win32gui
-import pywintypes
 import logging
 from typing import Optional
 
 import config
+import scanner
+import module_reader
+import module_snapshot
+from backends import MemoryBackend, MemoryReadError, MemoryWriteError, ModuleInfo, ProcessNotFound, PymemBackend
+from pointer_resolver import PointerResolver
+from retry_policy import Backoff
+from signature_cache import SignatureCache, module_fingerprint
 from entities import ResolvedAddresses
 
+# Three consecutive little-endian floats (x, y, z), as laid out by the game
+VECTOR3 = struct.Struct("<3f")
+# Signatures resolved at attach time, compiled once
+SIGNATURES = scanner.compile_signatures(config.AOB_SIGNATURES, config.SIGNATURE_EXTRACTS)
+
+
+class _ThreadCount(threading.local):
+    value = 0  # Each thread starts from the class default and increments its own copy
+
 
 class MemoryManager:
-    def __init__(self, process_name: str):
+    def __init__(self, process_name: str, backend: Optional[MemoryBackend] = None):
         self.process_name = process_name
-        self.pm: Optional[pymem.Pymem] = None
+        self.backend: MemoryBackend = backend if backend is not None else PymemBackend()
         self.process_id: Optional[int] = None
         self.module_base: Optional[int] = None
         self.noclip_address: Optional[int] = None
         self.localplayer_ptr: Optional[int] = None
+        self._pointer_resolver: Optional[PointerResolver] = None
         self._is_noclip_patched: bool = False
+        self._signature_cache = SignatureCache(config.SIGNATURE_CACHE_FILE)
+        # Held by the tick thread around its reads/writes and by detach(), so a detach
+        # (and its noclip restore) never interleaves with a tick's writes
+        self.lock = threading.RLock()
+        # Memory reads/writes issued to the backend, counted per thread so the tick thread's
+        # figures don't include the resolver thread's background reads
+        self._syscalls = _ThreadCount()
 
     def attach(self) -> bool:
         try:
-            self.pm = pymem.Pymem(self.process_name)
-            self.process_id = self.pm.process_id
-            module = pymem.process.module_from_name(self.pm.process_handle, self.process_name)
+            self.process_id = self.backend.open_process(self.process_name)
+            module = self.backend.find_module(self.process_name)
             if not module:
-                logging.error(f"Error: Could not find module {self.process_name}")
-                self.pm = None
+                logging.error("Error: Could not find module %s", self.process_name)
+                self.backend.close_process()
+                self.process_id = None
                 return False
-            self.module_base = module.lpBaseOfDll
-            logging.info(f"Successfully attached to {self.process_name} (PID: {self.process_id}), Base: {hex(self.module_base)}")
-            self._find_noclip_address(module)
-            self._find_localplayer_pointer(module)
+            self.module_base = module.base
+            self._pointer_resolver = None
+            logging.info("Successfully attached to %s (PID: %s), Base: %#x", self.process_name, self.process_id, self.module_base)
+            self._resolve_signatures(module)
             return True
-        except pymem.exception.ProcessNotFound:
-            self.pm = None
+        except ProcessNotFound:
             self.process_id = None
             self.module_base = None
-            logging.error(f"Error: Process {self.process_name} not found.")
+            logging.error("Error: Process %s not found.", self.process_name)
             return False
         except Exception as e:
-            self.pm = None
+            self.backend.close_process()
             self.process_id = None
             self.module_base = None
-            logging.error(f"Error attaching to process: {e}")
+            logging.error("Error attaching to process: %s", e)
             return False
 
+    def _resolve_signatures(self, module: ModuleInfo) -> None:
+        self.localplayer_ptr = None
+        matches = self._cached_signatures(module) or self._scan_signatures(module)
+        self._find_noclip_address(matches)
+        self._find_localplayer_pointer(module, matches)
+
+    def signatures_resolved(self) -> bool:
+        """Whether the signatures pointer resolution depends on were found (the noclip patch is optional)."""
+        return self.localplayer_ptr is not None
+
+    def rescan_signatures(self) -> bool:
+        """Scans the module again, e.g. after an attach to a game that was still unpacking. Returns signatures_resolved()."""
+        if not self.is_attached():
+            return False
+        module = self.backend.find_module(self.process_name)
+        if not module:
+            logging.error("Error: Could not find module %s", self.process_name)
+            return False
+        self._resolve_signatures(module)
+        return self.signatures_resolved()
+
     def detach(self):
-        if self.pm:
+        with self.lock:
+            if not self.is_attached():
+                return
             try:
                 # Restore noclip bytes if patched before closing
                 if self.noclip_address and self._is_noclip_patched:
-                    self.write_bytes(self.noclip_address, config.ORIGINAL_NOCLIP_BYTES)
-                    self._is_noclip_patched = False
-                    logging.info("[Bypass] Restored original bytes on detach.")
-                self.pm.close_process()
+                    if self.write_bytes(self.noclip_address, config.ORIGINAL_NOCLIP_BYTES):
+                        logging.info("[Bypass] Restored original bytes on detach.")
+                    else:
+                        logging.error("[Bypass] Could not restore original bytes on detach.")
+                self.backend.close_process()
             except Exception as e:
-                logging.error(f"Error during detach: {e}")
+                logging.error("Error during detach: %s", e)
             finally:
-                self.pm = None
                 self.process_id = None
                 self.module_base = None
                 self.noclip_address = None
+                self.localplayer_ptr = None
+                self._is_noclip_patched = False
+                self._pointer_resolver = None
                 logging.info("Detached from process.")
 
     def is_attached(self) -> bool:
-        return self.pm is not None and self.process_id is not None
+        return self.process_id is not None
+
+    @property
+    def syscalls(self) -> int:
+        """Running count of memory reads/writes the calling thread has issued to the backend."""
+        return self._syscalls.value
+
+    def _read_bytes(self, address: int, size: int) -> bytes:
+        self._syscalls.value += 1
+        return self.backend.read_bytes(address, size)
+
+    def _write_bytes(self, address: int, data: bytes) -> None:
+        self._syscalls.value += 1
+        self.backend.write_bytes(address, data)
 
     def _read_uint(self, address: int) -> Optional[int]:
-        if not self.pm:
+        if not self.is_attached():
             return None
         try:
-            return self.pm.read_uint(address)
-        except (pymem.exception.MemoryReadError, TypeError, ValueError):
+            return struct.unpack("<I", self._read_bytes(address, 4))[0]
+        except (MemoryReadError, TypeError, ValueError, struct.error):
             return None
 
-    def read_float(self, address: int) -> Optional[float]:
-        if not self.pm:
+    def read_struct(self, address: int, layout: struct.Struct) -> Optional[tuple]:
+        """Reads a contiguous struct with a single read_bytes call."""
+        if not self.is_attached():
             return None
         try:
-            return self.pm.read_float(address)
-        except (pymem.exception.MemoryReadError, TypeError, ValueError):
+            return layout.unpack_from(self._read_bytes(address, layout.size))
+        except (MemoryReadError, TypeError, ValueError, struct.error):
             return None
 
-    def write_float(self, address: int, value: float) -> bool:
-        if not self.pm:
+    def write_struct(self, address: int, layout: struct.Struct, *values) -> bool:
+        """Writes a contiguous struct with a single write_bytes call."""
+        if not self.is_attached():
             return False
         try:
-            self.pm.write_float(address, value)
+            self._write_bytes(address, layout.pack(*values))
             return True
-        except (pymem.exception.MemoryWriteError, TypeError, ValueError):
+        except (MemoryWriteError, TypeError, ValueError, struct.error):
             return False
 
+    def read_vector(self, address: int) -> Optional[tuple[float, float, float]]:
+        return self.read_struct(address, VECTOR3)
+
+    def read_bytes(self, address: int, size: int) -> Optional[bytes]:
+        if not self.is_attached():
+            return None
+        try:
+            return self._read_bytes(address, size)
+        except (MemoryReadError, TypeError, ValueError):
+            return None
+
     def write_bytes(self, address: int, value: bytes) -> bool:
-        if not self.pm:
+        if not self.is_attached():
             return False
         try:
-            self.pm.write_bytes(address, value, len(value))
+            self._write_bytes(address, value)
             return True
-        except (pymem.exception.MemoryWriteError, TypeError, ValueError):
+        except (MemoryWriteError, TypeError, ValueError):
             return False
 
-    def _resolve_pointer_chain(self, base_address: int, offsets: list[int]) -> Optional[int]:
-        if not self.pm:
-            return False
-        try:
-            addr = base_address
-            for offset in offsets:
-                addr = self._read_uint(addr + offset)
-                if addr is None:
-                    logging.error(f"Pointer chain failed at offset '{offset}'.")
-                    return None
-        except (pymem.exception.MemoryReadError, TypeError, ValueError) as e:
-            logging.error(f"Error resolving pointer chain: {e}")
-            return False
-        return addr
+    def addresses_changed(self) -> bool:
+        """Cheap check (root pointer plus sentinel links) for whether resolved addresses went stale."""
+        if not self.is_attached() or self._pointer_resolver is None:
+            return True
+        return self._pointer_resolver.changed(config.POINTER_SENTINEL_CHAINS)
 
-    def resolve_addresses(self) -> Optional[ResolvedAddresses]:
-        if not self.pm or not self.module_base:
+    def chain_root(self) -> Optional[int]:
+        """One-read probe of the local player pointer, from which every chain starts."""
+        if not self.is_attached() or not self.module_base or self.localplayer_ptr is None:
             return None
+        return self._read_uint(self.module_base + self.localplayer_ptr)
 
-        try:
-            # Read the initial static pointer relative to the module base
-            chain_start_addr = self._read_uint(self.module_base + self.localplayer_ptr)
-            if not chain_start_addr:
-                logging.error("Failed to read chain start address")
-                return None
-
-            # Resolve Velocity Pointers
-            coord_vel_base_addr = self._resolve_pointer_chain(chain_start_addr, config.VELOCITY_OFFSETS)
-            if not coord_vel_base_addr:
-                logging.error("Failed to resolve velocity base address")
-                return None
+    def resolve_addresses(self, full: bool = False) -> Optional[ResolvedAddresses]:
+        """Resolves the velocity/camera addresses. With full, every link is re-read instead of only changed ones."""
+        if not self.is_attached() or not self.module_base:
+            return None
+        if self.localplayer_ptr is None:
+            logging.error("Failed to read chain start address")
+            return None
 
-            # Resolve Camera Pointers
-            cam_base_addr = self._resolve_pointer_chain(chain_start_addr, config.CAMERA_OFFSETS)
-            if not cam_base_addr:
-                logging.error("Failed to resolve camera base address.")
+        try:
+            if self._pointer_resolver is None:
+                # Both chains start from the static local player pointer relative to the module base
+                self._pointer_resolver = PointerResolver(
+                    self._read_uint,
+                    self.module_base + self.localplayer_ptr,
+                    {"velocity": config.VELOCITY_OFFSETS, "camera": config.CAMERA_OFFSETS},
+                )
+            elif full:
+                self._pointer_resolver.invalidate()
+            bases = self._pointer_resolver.resolve()
+            if not bases:
+                logging.error("Failed to resolve velocity/camera base addresses.")
                 return None
 
             return ResolvedAddresses(
-                velocity_x=coord_vel_base_addr + 0xB0,
-                velocity_y=coord_vel_base_addr + 0xB4,
-                velocity_z=coord_vel_base_addr + 0xB8,
-                camera_x=cam_base_addr + 0x100,
-                camera_y=cam_base_addr + 0x104,
-                camera_z=cam_base_addr + 0x108,
+                velocity=bases["velocity"] + config.VELOCITY_VECTOR_OFFSET,
+                camera=bases["camera"] + config.CAMERA_VECTOR_OFFSET,
             )
-        except (pymem.exception.MemoryReadError, TypeError, ValueError, AttributeError) as e:
-            logging.error(f"Exception during pointer resolution: {e}")
+        except (MemoryReadError, TypeError, ValueError, AttributeError) as e:
+            logging.error("Exception during pointer resolution: %s", e)
             return None
 
-    def _aob_to_bytes(self, pattern: str) -> bytes:
-        return bytes(int(b, 16) for b in re.findall(r"[0-9A-Fa-f]{2}", pattern))
-
-    def _find_noclip_address(self, module) -> None:
-        if not self.pm:
+    def _find_noclip_address(self, matches: dict[str, list[int]]) -> None:
+        if not self.is_attached():
             return
         try:
-            noclip_addresses = self._aob_scan(module, config.NOCLIP_AOB_PATTERN)
+            noclip_addresses = matches.get("noclip")
             if noclip_addresses:
-                self.noclip_address = noclip_addresses[0]
-                logging.info(f"[Bypass] Address found: {hex(self.noclip_address)}")
+                self.noclip_address = SIGNATURES["noclip"].extract.apply(noclip_addresses[0], self.module_base, self._read_uint)
+                logging.info("[Bypass] Address found: %#x", self.noclip_address)
             else:
                 logging.warning("[Bypass] Pattern not found.")
         except Exception as e:
-            logging.error(f"[Bypass] Error scanning for pattern: {e}")
+            logging.error("[Bypass] Error scanning for pattern: %s", e)
             self.noclip_address = None
 
-    def _pattern_to_bytes(self, pattern: str) -> bytes:
-        parts = pattern.split()
-        byte_array = []
-        for part in parts:
-            if part == '??':
-                byte_array.append(None)
-            else:
-                byte_array.append(int(part, 16))
-        return byte_array
-
+    def _iter_module_chunks(self, module: ModuleInfo, overlap: int):
+        """Streams the committed, readable parts of the module image in overlapping chunks."""
+        return module_reader.iter_module_chunks(
+            self._read_bytes, self.backend.query_region, module.base, module.size, config.SCAN_CHUNK_SIZE, overlap
+        )
 
-    def _aob_scan(self, module, pattern: str) -> Optional[int]:
-        base_address = module.lpBaseOfDll
-        module_size = module.SizeOfImage
+    def _scan_signatures(self, module: ModuleInfo) -> dict[str, list[int]]:
+        """Streams the module image once and resolves every signature in SIGNATURES."""
+        if not self.is_attached():
+            return {}
+        try:
+            overlap = scanner.max_pattern_length(SIGNATURES.values()) - 1
+            chunks = self._iter_module_chunks(module, overlap)
+            matches = scanner.scan_chunks(chunks, SIGNATURES.values(), first_only=True, workers=config.SCAN_WORKERS)
+        except Exception as e:
+            logging.error("Error scanning module for signatures: %s", e)
+            return {}
+
+        if all(matches.values()):
+            fingerprint = self._module_fingerprint(module)
+            if fingerprint:
+                offsets = {name: addresses[0] - module.base for name, addresses in matches.items()}
+                self._signature_cache.store(fingerprint, offsets)
+        return matches
+
+    def dump_module(self, path: str) -> bool:
+        """Writes the module image and its readable regions to a snapshot file for offline scanning."""
+        if not self.is_attached():
+            return False
+        module = self.backend.find_module(self.process_name)
+        if not module:
+            logging.error("Error: Could not find module %s", self.process_name)
+            return False
+        try:
+            ranges = module_reader.iter_readable_ranges(self.backend.query_region, module.base, module.base + module.size)
+            regions = module_snapshot.write_snapshot(
+                path, self.process_name, module.base, module.size, ranges, self._read_bytes,
+                self._module_fingerprint(module), config.SCAN_CHUNK_SIZE,
+            )
+        except (OSError, ValueError) as e:
+            logging.error("Could not write module snapshot %s: %s", path, e)
+            return False
+        logging.info("Dumped %s (%d readable bytes in %d regions) to %s", self.process_name, sum(end - start for start, end in regions), len(regions), path)
+        return True
 
-        bytes_memory = self.pm.read_bytes(base_address, module_size)
-        pattern_bytes = self._pattern_to_bytes(pattern)
+    def _module_fingerprint(self, module: ModuleInfo) -> Optional[str]:
+        return module_fingerprint(self._read_bytes, module.base, module.size, config.FINGERPRINT_SAMPLE_PAGES)
 
-        results = []
+    def _cached_signatures(self, module: ModuleInfo) -> Optional[dict[str, list[int]]]:
+        """Returns cached signature matches if the module is unchanged and every cached hit still validates."""
+        if not self.is_attached():
+            return None
+        fingerprint = self._module_fingerprint(module)
+        offsets = self._signature_cache.lookup(fingerprint) if fingerprint else None
+        if not offsets or set(offsets) != set(SIGNATURES):
+            return None
 
-        for i in range(len(bytes_memory) - len(pattern_bytes) + 1):
-            match = True
-            for j in range(len(pattern_bytes)):
-                if pattern_bytes[j] is not None and bytes_memory[i + j] != pattern_bytes[j]:
-                    match = False
-                    break
-            if match:
-                results.append(base_address + i)
+        matches = {}
+        for name, signature in SIGNATURES.items():
+            address = module.base + offsets[name]
+            try:
+                data = self._read_bytes(address, len(signature))
+            except MemoryReadError:
+                data = b""
+            if not signature.matches(data):
+                logging.info("Cached signature '%s' no longer matches. Rescanning module...", name)
+                self._signature_cache.invalidate(fingerprint)
+                return None
+            matches[name] = [address]
 
-        return results
+        logging.info("Resolved signatures from cache.")
+        return matches
 
-    def _find_localplayer_pointer(self, module) -> None:
-        if not self.pm:
+    def _find_localplayer_pointer(self, module: ModuleInfo, matches: dict[str, list[int]]) -> None:
+        if not self.is_attached():
             return
         try:
-            localplayer_ptrs = self._aob_scan(module, config.LOCALPLAYER_AOB_PATTERN)
-            if localplayer_ptrs:
-                self.localplayer_ptr = self._read_uint(localplayer_ptrs[0] + 1) - module.lpBaseOfDll
-                logging.info(f"[LocalPlayer] Address found: {hex(self.localplayer_ptr)}")
-            else:
+            localplayer_ptrs = matches.get("localplayer")
+            if not localplayer_ptrs:
                 logging.warning("[LocalPlayer] Pattern not found.")
+                return
+            self.localplayer_ptr = SIGNATURES["localplayer"].extract.apply(localplayer_ptrs[0], module.base, self._read_uint)
+            if self.localplayer_ptr is not None:
+                logging.info("[LocalPlayer] Address found: %#x", self.localplayer_ptr)
+            else:
+                logging.error("[LocalPlayer] Could not read the pointer at the pattern match.")
         except Exception as e:
-            logging.error(f"[LocalPlayer] Error scanning for pattern: {e}")
-
-    def is_moving(self, addresses: ResolvedAddresses) -> bool:
-        """Check if the player has significant velocity in memory."""
-        if not self.pm or not addresses:
-            return False
-        try:
-            vx = abs(self.read_float(addresses.velocity_x) or 0.0)
-            vy = abs(self.read_float(addresses.velocity_y) or 0.0)
-            vz = abs(self.read_float(addresses.velocity_z) or 0.0)
-            # Use a small threshold to account for floating point inaccuracies or slight drift
-            threshold = 0.1
-            return vx > threshold or vy > threshold or vz > threshold
-        except Exception:
-            return False  # Assume not moving if read fails
+            logging.error("[LocalPlayer] Error scanning for pattern: %s", e)
 
     def update_noclip_patch(self, should_be_moving: bool):
-        if not self.pm or not self.noclip_address:
+        with self.lock:
+            self._update_noclip_patch(should_be_moving)
+
+    def _update_noclip_patch(self, should_be_moving: bool):
+        if not self.is_attached() or not self.noclip_address:
             return
 
         try:
@@ -245,39 +338,30 @@ class MemoryManager:
                 if self.write_bytes(self.noclip_address, config.ORIGINAL_NOCLIP_BYTES):
                     self._is_noclip_patched = False
         except Exception as e:
-            logging.error(f"[Bypass] Error updating patch status: {e}")
+            logging.error("[Bypass] Error updating patch status: %s", e)
             # Disable bypass if patching fails critically
             self.noclip_address = None
 
-
-# --- Static Utility Functions ---
-
-
-def is_process_running(process_name: str) -> bool:
-    for p in psutil.process_iter(["name"]):
-        try:
-            if p.info["name"] == process_name:
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    return False
-
-
-def wait_for_process(process_name: str, interval_s: float = 1.0):
-    logging.info(f"Waiting for process {process_name}...")
-    while not is_process_running(process_name):
-        time.sleep(interval_s)
-    logging.info(f"Process {process_name} found.")
-
-
-def get_foreground_process_pid() -> Optional[int]:
-    try:
-        hwnd = win32gui.GetForegroundWindow()
-        if not hwnd:
-            return None
-        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        return pid
-    except (pywintypes.error, OSError, AttributeError):
-        # AttributeError can happen if win32gui functions aren't available
-        logging.warning("Could not get foreground window PID. win32gui might be missing or failed.")
-        return None
+    def is_process_running(self) -> bool:
+        return self.backend.is_process_running(self.process_name)
+
+    def wait_for_process(self, stop_event: Optional[threading.Event] = None, backoff: Optional[Backoff] = None) -> bool:
+        """
+        Blocks until the process is running, polling at backoff's growing delays (every
+        second without one). Returns False if stop_event got set first.
+        """
+        waiting = False
+        while not self.is_process_running():
+            if not waiting:
+                logging.info("Waiting for process %s...", self.process_name)
+                waiting = True
+            interval_s = backoff.failure() if backoff is not None else 1.0
+            if stop_event is None:
+                time.sleep(interval_s)
+            elif stop_event.wait(interval_s):
+                return False
+        if waiting:
+            if backoff is not None:
+                backoff.success()
+            logging.info("Process %s found.", self.process_name)
+        return True
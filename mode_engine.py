@@ -0,0 +1,223 @@
+# mode_engine.py
+import logging
+import struct
+import time
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Callable, Optional
+
+import config
+from entities import InputSnapshot, ResolvedAddresses, TickSnapshot
+from memory import VECTOR3, MemoryManager
+from profiling import LatencyHistogram
+
+# Memory regions a mode can read or write, by name. Each name is both a ResolvedAddresses
+# field (the region's address) and a TickSnapshot vector field; every region is an xyz
+# float triple.
+REGIONS = ("velocity", "camera")
+_SETTERS = {region: f"set_{region}" for region in REGIONS}
+_COMPONENTS = ("x", "y", "z")
+_FLOAT_SIZE = 4
+_FLOATS = {count: struct.Struct(f"<{count}f") for count in range(1, 4)}
+
+
+@dataclass(frozen=True)
+class WriteLayout:
+    """
+    Which components of snapshot.movement a mode writes into a region. Built once at
+    import (see write_layout), with the components already split into runs of adjacent
+    floats, so a tick's writes cost one call per run and allocate no plan.
+    """
+
+    region: str
+    components: tuple[str, ...]
+    # (byte offset in the region, float layout, component getter, single component, components) per run
+    runs: tuple[tuple[int, struct.Struct, Callable, bool, tuple[str, ...]], ...]
+
+
+def write_layout(region: str, *components: str) -> WriteLayout:
+    if region not in REGIONS or not components or not set(components) <= set(_COMPONENTS):
+        raise ValueError(f"Invalid write layout {region}{components}.")
+    indices = sorted({_COMPONENTS.index(component) for component in components})
+    groups: list[list[int]] = []
+    for index in indices:
+        if groups and groups[-1][-1] + 1 == index:
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    runs = []
+    for group in groups:
+        names = tuple(_COMPONENTS[index] for index in group)
+        runs.append((group[0] * _FLOAT_SIZE, _FLOATS[len(group)], attrgetter(*names), len(group) == 1, names))
+    return WriteLayout(region, tuple(_COMPONENTS[index] for index in indices), tuple(runs))
+
+
+# Fills snapshot.movement and returns the layout to write it with (None to write nothing)
+ApplyFn = Callable[[TickSnapshot, InputSnapshot, config.Configuration], Optional[WriteLayout]]
+
+
+@dataclass(frozen=True)
+class ModeSpec:
+    mode: config.HackMode
+    apply: ApplyFn  # Computes the tick's write from the snapshot; never touches memory itself
+    reads: frozenset[str]  # Regions apply() needs in the snapshot
+    writes: frozenset[str]  # Regions apply() may write
+    # Every write covers its whole region, so the written state is known without reading it
+    full_writes: bool = False
+    speed_attr: Optional[str] = None  # Configuration attribute adjusted by PgUp/PgDown
+    label: str = ""  # Display name in log messages
+
+
+# Registered modes in registration order, which is also the F4 cycle order
+MODES: dict[config.HackMode, ModeSpec] = {}
+
+
+def register_mode(mode: config.HackMode, reads=(), writes=(), full_writes: bool = False, speed_attr: Optional[str] = None, label: Optional[str] = None):
+    """Decorator registering an apply function as the implementation of a hack mode."""
+
+    def decorator(apply: ApplyFn) -> ApplyFn:
+        unknown = (set(reads) | set(writes)) - set(REGIONS)
+        if unknown:
+            raise ValueError(f"Mode {mode.name} declares unknown regions: {sorted(unknown)}")
+        MODES[mode] = ModeSpec(mode, apply, frozenset(reads), frozenset(writes), full_writes, speed_attr, label or mode.name.title())
+        return apply
+
+    return decorator
+
+
+def next_mode(mode: config.HackMode) -> config.HackMode:
+    modes = list(MODES)
+    return modes[(modes.index(mode) + 1) % len(modes)] if mode in MODES else modes[0]
+
+
+def coalesce(spans: list[tuple[int, int]], max_gap: int) -> list[tuple[int, int, list[int]]]:
+    """
+    Merges (address, size) spans whose gaps are at most max_gap bytes into
+    (address, size, member indices) runs, so each run costs one syscall.
+    """
+    runs: list[tuple[int, int, list[int]]] = []
+    for index in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+        address, size = spans[index]
+        if runs and address - (runs[-1][0] + runs[-1][1]) <= max_gap:
+            run_address, run_size, members = runs[-1]
+            runs[-1] = (run_address, max(run_size, address + size - run_address), members + [index])
+        else:
+            runs.append((address, size, [index]))
+    return runs
+
+
+@dataclass
+class ModeCost:
+    """Per-mode tick cost: engine time (reads, apply, writes) and memory syscalls."""
+
+    ticks: int = 0
+    syscalls: int = 0
+    tick_ns: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def summary(self) -> str:
+        syscalls_per_tick = self.syscalls / self.ticks if self.ticks else 0.0
+        return (
+            f"{self.ticks} ticks, p50 {self.tick_ns.percentile(50) / 1000:.1f} us, "
+            f"p99 {self.tick_ns.percentile(99) / 1000:.1f} us, {syscalls_per_tick:.2f} syscalls/tick"
+        )
+
+
+class ModeEngine:
+    """
+    Runs the active mode for one tick. Reads only the regions the mode declares (plus
+    velocity for the noclip check, unless the mode overwrites it in full), batching
+    regions within READ_COALESCE_GAP bytes of each other into one read, then applies
+    the mode's writes with contiguous writes merged into one call. Read plans are
+    cached per (mode, addresses) so planning costs nothing on a steady tick.
+    """
+
+    def __init__(self, mem_manager: MemoryManager, read_coalesce_gap: int = config.READ_COALESCE_GAP):
+        self.mem_manager = mem_manager
+        self.read_coalesce_gap = read_coalesce_gap
+        self.snapshot = TickSnapshot()  # Reused every tick
+        self.costs: dict[config.HackMode, ModeCost] = {}
+        self._plan_key: Optional[tuple] = None
+        self._read_plan: list[tuple[int, int, list[tuple[str, int]]]] = []
+
+    def _regions_to_read(self, spec: ModeSpec) -> list[str]:
+        # The noclip check needs the tick's final velocity
+        velocity_known = spec.full_writes and "velocity" in spec.writes
+        needed = set(spec.reads) if velocity_known else set(spec.reads) | {"velocity"}
+        return [region for region in REGIONS if region in needed]
+
+    def _plan_reads(self, spec: ModeSpec, addresses: ResolvedAddresses):
+        key = (spec.mode, addresses)
+        if key == self._plan_key:
+            return
+        regions = self._regions_to_read(spec)
+        spans = [(getattr(addresses, region), VECTOR3.size) for region in regions]
+        self._read_plan = [
+            (address, size, [(regions[i], spans[i][0] - address) for i in members])
+            for address, size, members in coalesce(spans, self.read_coalesce_gap)
+        ]
+        self._plan_key = key
+
+    def _read(self) -> TickSnapshot:
+        snapshot = self.snapshot
+        snapshot.clear()
+        mem_manager = self.mem_manager
+        for address, size, members in self._read_plan:
+            data = mem_manager.read_bytes(address, size)
+            if data is None and len(members) > 1:
+                # The batched span failed (e.g. it crosses an unreadable page); read each region alone
+                for region, offset in members:
+                    values = mem_manager.read_vector(address + offset)
+                    if values is not None:
+                        getattr(snapshot, _SETTERS[region])(*values)
+                continue
+            if data is not None:
+                for region, offset in members:
+                    getattr(snapshot, _SETTERS[region])(*VECTOR3.unpack_from(data, offset))
+        return snapshot
+
+    def _write(self, addresses: ResolvedAddresses, layout: WriteLayout):
+        snapshot = self.snapshot
+        movement = snapshot.movement
+        mem_manager = self.mem_manager
+        region_address = getattr(addresses, layout.region)
+        for offset, float_layout, getter, single, components in layout.runs:
+            if single:
+                written = mem_manager.write_struct(region_address + offset, float_layout, getter(movement))
+            else:
+                written = mem_manager.write_struct(region_address + offset, float_layout, *getter(movement))
+            if not written:
+                continue
+            # Mirror the write into the snapshot so nothing has to be read back
+            vector = getattr(snapshot, layout.region)
+            if vector is None:
+                getattr(snapshot, _SETTERS[layout.region])(0.0, 0.0, 0.0)
+                vector = getattr(snapshot, layout.region)
+            for component in components:
+                setattr(vector, component, getattr(movement, component))
+
+    def tick(self, mode: config.HackMode, addresses: ResolvedAddresses, keys: InputSnapshot, cfg: config.Configuration) -> TickSnapshot:
+        """Reads, applies and writes one tick of mode. Returns the snapshot as of after the writes."""
+        spec = MODES.get(mode)
+        if spec is None:
+            logging.error("No implementation registered for hack mode %s.", mode.name)
+            self.snapshot.clear()
+            return self.snapshot
+
+        started = time.perf_counter_ns()
+        syscalls_before = self.mem_manager.syscalls
+        self._plan_reads(spec, addresses)
+        snapshot = self._read()
+        layout = spec.apply(snapshot, keys, cfg)
+        if layout is not None:
+            self._write(addresses, layout)
+
+        cost = self.costs.get(mode)
+        if cost is None:
+            cost = self.costs[mode] = ModeCost()
+        cost.ticks += 1
+        cost.syscalls += self.mem_manager.syscalls - syscalls_before
+        cost.tick_ns.record(time.perf_counter_ns() - started)
+        return snapshot
+
+    def cost_summary(self) -> str:
+        return "; ".join(f"{mode.name}: {cost.summary()}" for mode, cost in self.costs.items()) or "no ticks"
@@ -0,0 +1,68 @@
+# module_reader.py
+import logging
+from typing import Callable, Iterator
+
+# Windows memory region state/protection flags (see MEMORY_BASIC_INFORMATION)
+MEM_COMMIT = 0x1000
+PAGE_NOACCESS = 0x01
+PAGE_GUARD = 0x100
+
+# (address) -> (region_base, region_size, state, protect)
+RegionQuery = Callable[[int], tuple[int, int, int, int]]
+
+
+def is_readable(state: int, protect: int) -> bool:
+    return state == MEM_COMMIT and protect != 0 and not protect & (PAGE_NOACCESS | PAGE_GUARD)
+
+
+def iter_readable_ranges(query: RegionQuery, start: int, end: int) -> Iterator[tuple[int, int]]:
+    """Yields (start, end) address ranges of committed, readable memory, merging adjacent regions."""
+    run_start = None
+    address = start
+    while address < end:
+        region_base, region_size, state, protect = query(address)
+        if region_size <= 0:
+            break
+        region_end = min(region_base + region_size, end)
+        if is_readable(state, protect):
+            if run_start is None:
+                run_start = address
+        elif run_start is not None:
+            yield run_start, address
+            run_start = None
+        address = region_end
+    if run_start is not None:
+        yield run_start, min(address, end)
+
+
+def iter_chunks(read_bytes: Callable[[int, int], bytes], ranges, chunk_size: int, overlap: int) -> Iterator[tuple[int, memoryview]]:
+    """
+    Reads address ranges in chunks of chunk_size bytes, each extended by overlap bytes
+    into the next chunk so that matches of up to overlap + 1 bytes are never split.
+    Yields (address, memoryview) pairs in ascending address order; only one chunk is held at a time.
+    """
+    for range_start, range_end in ranges:
+        pos = range_start
+        while pos < range_end:
+            size = min(chunk_size + overlap, range_end - pos)
+            try:
+                data = read_bytes(pos, size)
+            except Exception as e:
+                logging.debug("Skipping unreadable chunk at %#x: %s", pos, e)
+            else:
+                yield pos, memoryview(data)
+            if pos + size >= range_end:
+                break
+            pos += chunk_size
+
+
+def iter_module_chunks(read_bytes: Callable[[int, int], bytes], query: RegionQuery, module_base: int, module_size: int, chunk_size: int, overlap: int) -> Iterator[tuple[int, memoryview]]:
+    """Streams the readable parts of a module image as overlapping chunks."""
+    ranges = iter_readable_ranges(query, module_base, module_base + module_size)
+    return iter_chunks(read_bytes, ranges, chunk_size, overlap)
+
+
+def iter_buffer_chunks(data, base_address: int, chunk_size: int, overlap: int) -> Iterator[tuple[int, memoryview]]:
+    """Splits an in-memory image into overlapping shards, as iter_chunks does for a live process."""
+    view = memoryview(data)
+    return iter_chunks(lambda address, size: view[address - base_address : address - base_address + size], [(base_address, base_address + len(view))], chunk_size, overlap)
@@ -0,0 +1,218 @@
+# module_snapshot.py
+"""
+Module image snapshots: a live module dumped to a file once, then scanned offline
+through mmap, e.g. to work out new signatures after a game update.
+
+    python -m module_snapshot dump [Trove.exe.snapshot]
+    python -m module_snapshot scan Trove.exe.snapshot [--pattern NAME=PATTERN ...]
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Callable, Iterable, Optional
+
+import scanner
+from backends import MemoryReadError
+
+# File layout: magic, uint32 header length, JSON header, zero padding, then the raw image
+# starting at a multiple of DATA_ALIGNMENT (a valid mmap offset on every platform).
+# Unreadable parts of the image are left as zeros and excluded from "regions".
+MAGIC = b"MODSNAP1"
+_HEADER_LENGTH = struct.Struct("<I")
+DATA_ALIGNMENT = 0x10000
+
+
+def write_snapshot(
+    path: str,
+    module_name: str,
+    module_base: int,
+    module_size: int,
+    ranges: Iterable[tuple[int, int]],
+    read_bytes: Callable[[int, int], bytes],
+    fingerprint: Optional[str] = None,
+    chunk_size: int = 4 * 1024 * 1024,
+) -> list[tuple[int, int]]:
+    """
+    Writes the readable ranges of a module image to a snapshot file (atomically, via a
+    temporary file). Returns the (start, end) address ranges actually written.
+    """
+    regions: list[tuple[int, int]] = []
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        # The header is written last, once the regions are known; reserve its space first
+        data_offset = DATA_ALIGNMENT
+        f.truncate(data_offset + module_size)
+        for range_start, range_end in ranges:
+            pos = range_start
+            while pos < range_end:
+                size = min(chunk_size, range_end - pos)
+                try:
+                    data = read_bytes(pos, size)
+                except MemoryReadError as e:
+                    logging.debug("Skipping unreadable chunk at %#x: %s", pos, e)
+                else:
+                    f.seek(data_offset + pos - module_base)
+                    f.write(data)
+                    if regions and regions[-1][1] == pos:
+                        regions[-1] = (regions[-1][0], pos + size)
+                    else:
+                        regions.append((pos, pos + size))
+                pos += size
+
+        header = json.dumps(
+            {
+                "module": module_name,
+                "base": module_base,
+                "size": module_size,
+                "regions": regions,
+                "fingerprint": fingerprint,
+                "created": time.time(),
+                "data_offset": data_offset,
+            }
+        ).encode("utf-8")
+        if len(MAGIC) + _HEADER_LENGTH.size + len(header) > data_offset:
+            raise ValueError(f"Snapshot header too large ({len(header)} bytes).")
+        f.seek(0)
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+    os.replace(tmp_path, path)
+    return regions
+
+
+class ModuleSnapshot:
+    """
+    A snapshot file opened for scanning. data is a read-only mmap of exactly the module
+    image, so data[address - base] is the byte at address and scans run on the page
+    cache with no copy of the image.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a module snapshot.")
+            (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            header = json.loads(f.read(header_length).decode("utf-8"))
+        self.module_name: str = header["module"]
+        self.base: int = header["base"]
+        self.size: int = header["size"]
+        self.regions: list[tuple[int, int]] = [tuple(region) for region in header["regions"]]
+        self.fingerprint: Optional[str] = header["fingerprint"]
+        self.created: float = header["created"]
+        self._file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self._file.fileno(), self.size, offset=header["data_offset"], access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> "ModuleSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read_bytes(self, address: int, size: int) -> bytes:
+        """Reads from the image like a live process would. Raises MemoryReadError outside the readable regions."""
+        for start, end in self.regions:
+            if start <= address and address + size <= end:
+                offset = address - self.base
+                return self.data[offset : offset + size]
+        raise MemoryReadError(f"Could not read {size} bytes at {hex(address)} from snapshot")
+
+    def read_uint(self, address: int) -> Optional[int]:
+        try:
+            return struct.unpack("<I", self.read_bytes(address, 4))[0]
+        except MemoryReadError:
+            return None
+
+    def scan(self, signatures: Iterable[scanner.Signature], first_only: bool = False) -> dict[str, list[int]]:
+        """Scans every readable region in place; returns absolute addresses per signature name."""
+        signatures = list(signatures)
+        results: dict[str, list[int]] = {signature.name: [] for signature in signatures}
+        for start, end in self.regions:
+            pending = [signature for signature in signatures if not (first_only and results[signature.name])]
+            if not pending:
+                break
+            region_results = scanner.scan_signatures(self.data, pending, self.base, first_only, start - self.base, end - self.base)
+            for name, matches in region_results.items():
+                results[name].extend(matches)
+        return results
+
+
+# --- Command Line ---
+
+
+def _dump(path: Optional[str]) -> int:
+    import config
+    import memory
+
+    path = path or f"{config.PROCESS_NAME}.snapshot"
+    mem_manager = memory.MemoryManager(config.PROCESS_NAME)
+    if not mem_manager.attach():
+        return 1
+    try:
+        return 0 if mem_manager.dump_module(path) else 1
+    finally:
+        mem_manager.detach()
+
+
+def _signature_arg(value: str) -> scanner.Signature:
+    """argparse type for --pattern NAME=PATTERN."""
+    name, separator, pattern = value.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATTERN, got {value!r}")
+    try:
+        return scanner.Signature.compile(name, pattern)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid pattern {value!r}: {e}")
+
+
+def _scan(path: str, signatures: list[scanner.Signature], first_only: bool) -> int:
+    if not signatures:
+        import memory
+
+        signatures = list(memory.SIGNATURES.values())
+
+    with ModuleSnapshot(path) as snapshot:
+        print(f"{snapshot.module_name} at {hex(snapshot.base)}, {snapshot.size / 2**20:.1f} MB, fingerprint {snapshot.fingerprint}")
+        started = time.perf_counter()
+        results = snapshot.scan(signatures, first_only)
+        elapsed = time.perf_counter() - started
+        for signature in signatures:
+            matches = results[signature.name]
+            shown = ", ".join(hex(match) for match in matches[:8]) + (" ..." if len(matches) > 8 else "")
+            print(f"{signature.name}: {len(matches)} match(es) {shown}")
+            if matches:
+                value = signature.extract.apply(matches[0], snapshot.base, snapshot.read_uint)
+                print(f"  extracted: {hex(value) if value is not None else 'unreadable'}")
+        print(f"Scanned in {elapsed * 1000:.1f} ms ({snapshot.size / 2**20 / elapsed:.0f} MB/s)")
+    return 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    dump = commands.add_parser("dump", help="Dump the running game's module image.")
+    dump.add_argument("path", nargs="?", help="Output file (default: <process name>.snapshot).")
+    scan = commands.add_parser("scan", help="Scan a snapshot for the configured signatures or given patterns.")
+    scan.add_argument("path")
+    scan.add_argument("--pattern", action="append", default=[], type=_signature_arg, metavar="NAME=PATTERN", help='e.g. noclip="DC 67 68"')
+    scan.add_argument("--first", action="store_true", help="Stop at the first match of each pattern.")
+    args = parser.parse_args()
+
+    if args.command == "dump":
+        raise SystemExit(_dump(args.path))
+    raise SystemExit(_scan(args.path, args.pattern, args.first))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# pointer_resolver.py
+import logging
+from typing import Callable, Iterable, Optional
+
+
+class _Link:
+    """One dereference in a pointer chain: value = read_uint(parent value + offset)."""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        self.address: Optional[int] = None
+        self.value: Optional[int] = None
+        self.children: list["_Link"] = []
+        self.chain_names: list[str] = []
+
+    def child(self, offset: int) -> "_Link":
+        for link in self.children:
+            if link.offset == offset:
+                return link
+        link = _Link(offset)
+        self.children.append(link)
+        return link
+
+
+class PointerResolver:
+    """
+    Resolves several pointer chains that start from the same static address.
+
+    Chains are stored as a tree so shared prefixes are read once, and every link keeps
+    the address it last read and the value it got. On each resolve() the root is
+    re-read; a deeper link is only re-read when its parent's value moved, so a stable
+    chain costs a single read.
+    """
+
+    def __init__(self, read_uint: Callable[[int], Optional[int]], root_address: int, chains: dict[str, list[int]]):
+        self._read_uint = read_uint
+        self._root = _Link(root_address)
+        self._chain_paths: dict[str, list[_Link]] = {}
+        for name, offsets in chains.items():
+            path = [self._root]
+            for offset in offsets:
+                path.append(path[-1].child(offset))
+            path[-1].chain_names.append(name)
+            self._chain_paths[name] = path
+
+    def invalidate(self):
+        """Forgets every cached link so the next resolve() walks all chains from the root."""
+        stack = [self._root]
+        while stack:
+            link = stack.pop()
+            link.address = None
+            link.value = None
+            stack.extend(link.children)
+
+    def changed(self, sentinel_chains: Iterable[str] = ()) -> bool:
+        """
+        Cheap per-tick staleness check: re-reads the root and the last link of each
+        sentinel chain and compares them with the cached values. Returns True if any
+        of them moved, failed to read, or was never resolved. A moved sentinel drops
+        the cached links of its chain so the next resolve() re-walks it.
+        """
+        root = self._root
+        if root.address is None or root.value is None:
+            return True
+        if self._read_uint(root.address) != root.value:
+            return True
+
+        for name in sentinel_chains:
+            path = self._chain_paths[name]
+            end = path[-1]
+            if end.address is not None and end.value is not None:
+                if self._read_uint(end.address) == end.value:
+                    continue
+            for link in path[1:]:
+                link.address = None
+                link.value = None
+            return True
+        return False
+
+    def resolve(self) -> Optional[dict[str, int]]:
+        """Returns the final value of every chain, or None if any link can't be read."""
+        results: dict[str, int] = {}
+        self._root.address = None  # Always re-read the root
+        if not self._refresh(self._root, 0, results):
+            return None
+        return results
+
+    def _refresh(self, link: _Link, parent_value: int, results: dict[str, int]) -> bool:
+        address = parent_value + link.offset
+        if address != link.address or link.value is None:
+            value = self._read_uint(address)
+            if not value:
+                link.address = None
+                link.value = None
+                if link is self._root:
+                    logging.error("Failed to read chain start address %#x.", address)
+                else:
+                    logging.error("Pointer chain failed at offset %#x (address %#x).", link.offset, address)
+                return False
+            link.address = address
+            link.value = value
+
+        for name in link.chain_names:
+            results[name] = link.value
+        for child in link.children:
+            if not self._refresh(child, link.value, results):
+                return False
+        return True
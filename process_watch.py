@@ -0,0 +1,99 @@
+# process_watch.py
+import logging
+import threading
+import time
+from typing import Optional
+
+from backends import MemoryBackend
+
+
+class ProcessWatch:
+    """
+    Cached liveness and foreground state for the attached process.
+
+    Liveness uses the backend's cheap exit-code check on the known PID instead of
+    enumerating every process. Each value is refreshed once its interval has passed:
+    on demand when polled, or after start() by a watchdog thread, in which case the
+    accessors only read the last published value and never call the backend.
+    All methods are thread-safe.
+    """
+
+    def __init__(self, backend: MemoryBackend, liveness_interval_s: float, foreground_interval_s: float):
+        self.backend = backend
+        self.liveness_interval_s = liveness_interval_s
+        self.foreground_interval_s = foreground_interval_s
+        self._lock = threading.Lock()
+        self._process_id: Optional[int] = None
+        self._alive = False
+        self._foreground = False
+        self._liveness_checked_at = float("-inf")
+        self._foreground_checked_at = float("-inf")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the watchdog thread that keeps both values fresh in the background."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ProcessWatch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 1.0):
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout_s)
+        self._thread = None
+
+    def _run(self):
+        interval_s = min(self.liveness_interval_s, self.foreground_interval_s)
+        while not self._stop.is_set():
+            # A failing backend call must not end the thread, or the cached values freeze
+            for refresh in (self._refresh_liveness, self._refresh_foreground):
+                try:
+                    refresh()
+                except Exception as e:
+                    logging.error("Process watch check failed: %s", e)
+            self._stop.wait(interval_s)
+
+    def track(self, process_id: Optional[int]):
+        """Starts watching a new PID (or nothing, with None) and forces a fresh check."""
+        with self._lock:
+            self._process_id = process_id
+            self._alive = process_id is not None
+            self._foreground = False
+            self._liveness_checked_at = float("-inf")
+            self._foreground_checked_at = float("-inf")
+
+    def _refresh_liveness(self):
+        with self._lock:
+            if self._process_id is None:
+                self._alive = False
+                return
+            now = time.perf_counter()
+            if now - self._liveness_checked_at >= self.liveness_interval_s:
+                self._alive = self.backend.is_process_alive(self._process_id)
+                self._liveness_checked_at = now
+
+    def _refresh_foreground(self):
+        with self._lock:
+            if self._process_id is None:
+                self._foreground = False
+                return
+            now = time.perf_counter()
+            if now - self._foreground_checked_at >= self.foreground_interval_s:
+                foreground_pid = self.backend.get_foreground_process_pid()
+                self._foreground = foreground_pid is not None and foreground_pid == self._process_id
+                self._foreground_checked_at = now
+
+    def is_alive(self) -> bool:
+        if self._thread is None:
+            self._refresh_liveness()
+        return self._alive
+
+    def is_foreground(self) -> bool:
+        if self._thread is None:
+            self._refresh_foreground()
+        return self._foreground
@@ -0,0 +1,169 @@
+# profiling.py
+import json
+import logging
+import time
+
+import log_pipeline
+
+SUB_BUCKET_BITS = 4  # 16 linear sub-buckets per power of two, ~6% value resolution
+_LINEAR_LIMIT = 1 << (SUB_BUCKET_BITS + 1)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return max(value, 0)
+    shift = value.bit_length() - (SUB_BUCKET_BITS + 1)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """Highest value that lands in the given bucket."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << SUB_BUCKET_BITS)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integers (nanoseconds, counts): log-scaled
+    buckets with linear sub-buckets, so recording is O(1) with no allocation and
+    percentiles carry a bounded relative error.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (64 << SUB_BUCKET_BITS)
+        self.total = 0
+        self.max = 0
+        self.sum = 0
+
+    def record(self, value: int):
+        self.counts[_bucket_index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> int:
+        if not self.total:
+            return 0
+        threshold = max(1, round(self.total * p / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(_bucket_upper_bound(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.max = 0
+        self.sum = 0
+
+
+class NullProfiler:
+    """Stand-in used when profiling is disabled; every hook is a no-op."""
+
+    enabled = False
+
+    def begin_tick(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end_tick(self, syscalls: int = 0):
+        pass
+
+    def summary(self) -> dict:
+        return {}
+
+
+class TickProfiler:
+    """
+    Times the phases of each tick with perf_counter_ns laps and keeps a latency
+    histogram per phase, plus the tick's work time (excluding the sleep) and the
+    memory syscalls per tick.
+    A summary is logged every summary_interval_s, after which the histograms start
+    over. With dump, it is also logged as a JSON line to log_pipeline.PROFILE_LOGGER,
+    whose records the logging thread appends to the dump file, so the tick thread never
+    does file I/O.
+    """
+
+    enabled = True
+
+    def __init__(self, summary_interval_s: float, dump: bool = False):
+        self.summary_interval_s = summary_interval_s
+        self.dump = dump
+        self.phases: dict[str, LatencyHistogram] = {}
+        self.tick_ns = LatencyHistogram()
+        self.syscalls = LatencyHistogram()
+        self._tick_start = 0
+        self._lap_start = 0
+        self._last_syscalls = 0
+        self._window_start = time.perf_counter()
+
+    def begin_tick(self):
+        self._tick_start = self._lap_start = time.perf_counter_ns()
+
+    def lap(self, phase: str):
+        """Records the time since the previous lap (or the tick start) under phase."""
+        now = time.perf_counter_ns()
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        histogram.record(now - self._lap_start)
+        self._lap_start = now
+
+    def end_tick(self, syscalls: int = 0):
+        """
+        Closes the tick's work (call before sleeping; a following lap times the sleep).
+        syscalls is the tick thread's running total of memory calls, from MemoryManager.syscalls.
+        """
+        now = time.perf_counter_ns()
+        self.tick_ns.record(now - self._tick_start)
+        self._lap_start = now
+        self.syscalls.record(max(0, syscalls - self._last_syscalls))
+        self._last_syscalls = syscalls
+        if time.perf_counter() - self._window_start >= self.summary_interval_s:
+            self._report()
+
+    def summary(self) -> dict:
+        def describe(histogram: LatencyHistogram, scale: float) -> dict:
+            return {
+                "count": histogram.total,
+                "mean": round(histogram.mean() / scale, 3),
+                "p50": round(histogram.percentile(50) / scale, 3),
+                "p99": round(histogram.percentile(99) / scale, 3),
+                "max": round(histogram.max / scale, 3),
+            }
+
+        return {
+            "tick_us": describe(self.tick_ns, 1000.0),
+            "phases_us": {name: describe(histogram, 1000.0) for name, histogram in self.phases.items()},
+            "syscalls_per_tick": describe(self.syscalls, 1.0),
+        }
+
+    def _report(self):
+        summary = self.summary()
+        tick = summary["tick_us"]
+        logging.info(
+            "[Profile] %s ticks, tick p50 %s us, p99 %s us, syscalls/tick p50 %s",
+            tick["count"], tick["p50"], tick["p99"], summary["syscalls_per_tick"]["p50"],
+        )
+        for name, phase in summary["phases_us"].items():
+            logging.info("[Profile]   %-10s p50 %s us, p99 %s us, max %s us", name, phase["p50"], phase["p99"], phase["max"])
+
+        if self.dump:
+            logging.getLogger(log_pipeline.PROFILE_LOGGER).info(json.dumps({"time": time.time(), **summary}))
+
+        self.tick_ns.reset()
+        self.syscalls.reset()
+        for histogram in self.phases.values():
+            histogram.reset()
+        self._window_start = time.perf_counter()
@@ -0,0 +1,105 @@
+# retry_policy.py
+import random
+import time
+from typing import Optional
+
+_NO_PROBE = object()
+
+
+class Backoff:
+    """
+    Failure state and retry timing for one subsystem (attach, signature scan, ...).
+
+    Each consecutive failure doubles the delay (by multiplier) from initial_s up to
+    max_s, and every delay is spread by +/- jitter (a fraction) so retries of separate
+    subsystems don't line up. success() resets it. A failure can record a probe value
+    from a cheap check; if the check later returns something else, the subsystem is
+    retried at once instead of waiting out the delay.
+    """
+
+    def __init__(self, name: str, initial_s: float, max_s: float, multiplier: float = 2.0, jitter: float = 0.2, rng: Optional[random.Random] = None):
+        self.name = name
+        self.initial_s = initial_s
+        self.max_s = max_s
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self.failures = 0  # Consecutive failures; 0 while healthy
+        self.total_failures = 0
+        self.failed_since: Optional[float] = None
+        self.retry_at = float("-inf")
+        self._probe = _NO_PROBE
+
+    @property
+    def failing(self) -> bool:
+        return self.failures > 0
+
+    def delay_s(self) -> float:
+        """The un-jittered delay after the current number of consecutive failures."""
+        if not self.failures:
+            return 0.0
+        return min(self.max_s, self.initial_s * self.multiplier ** (self.failures - 1))
+
+    def failure(self, now: Optional[float] = None, probe=_NO_PROBE) -> float:
+        """Records a failure and returns the delay before the next attempt."""
+        now = time.perf_counter() if now is None else now
+        if not self.failures:
+            self.failed_since = now
+        self.failures += 1
+        self.total_failures += 1
+        delay_s = self.delay_s()
+        if self.jitter:
+            delay_s *= 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        self.retry_at = now + delay_s
+        self._probe = probe
+        return delay_s
+
+    def success(self, now: Optional[float] = None) -> Optional[float]:
+        """Resets the failure state. Returns how long the subsystem had been failing, or None if it wasn't."""
+        if not self.failures:
+            return None
+        now = time.perf_counter() if now is None else now
+        outage_s = now - self.failed_since
+        self.reset()
+        return outage_s
+
+    def reset(self):
+        self.failures = 0
+        self.failed_since = None
+        self.retry_at = float("-inf")
+        self._probe = _NO_PROBE
+
+    def ready(self, now: Optional[float] = None, probe=_NO_PROBE) -> bool:
+        """True if an attempt is due: healthy, the delay has passed, or probe differs from the one at the failure."""
+        if not self.failures:
+            return True
+        now = time.perf_counter() if now is None else now
+        if now >= self.retry_at:
+            return True
+        return probe is not _NO_PROBE and self._probe is not _NO_PROBE and probe != self._probe
+
+    def remaining_s(self, now: Optional[float] = None) -> float:
+        now = time.perf_counter() if now is None else now
+        return max(0.0, self.retry_at - now)
+
+    def should_log(self) -> bool:
+        """Logs the 1st, 2nd, 4th, 8th, ... consecutive failure, so a long outage logs only a handful of lines."""
+        return self.failures > 0 and self.failures & (self.failures - 1) == 0
+
+
+class RetryPolicy:
+    """One Backoff per subsystem, built from {name: (initial_s, max_s)}."""
+
+    def __init__(self, backoffs: dict[str, tuple[float, float]], jitter: float = 0.2, rng: Optional[random.Random] = None):
+        rng = rng or random.Random()
+        self._backoffs = {name: Backoff(name, initial_s, max_s, jitter=jitter, rng=rng) for name, (initial_s, max_s) in backoffs.items()}
+
+    def __getitem__(self, name: str) -> Backoff:
+        return self._backoffs[name]
+
+    def reset(self):
+        for backoff in self._backoffs.values():
+            backoff.reset()
+
+    def summary(self) -> str:
+        return ", ".join(f"{backoff.name}: {backoff.total_failures}" for backoff in self._backoffs.values())
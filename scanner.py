@@ -0,0 +1,343 @@
+# scanner.py
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+def parse_pattern(pattern: str) -> list[Optional[int]]:
+    """Parses an AOB pattern string ("A1 ?? 8B") into bytes, with None for wildcards."""
+    pattern_bytes = []
+    for part in pattern.split():
+        if part == "??":
+            pattern_bytes.append(None)
+        else:
+            pattern_bytes.append(int(part, 16))
+    return pattern_bytes
+
+
+@dataclass(frozen=True)
+class Extract:
+    """How a signature's match address turns into the value the signature is for."""
+
+    offset: int = 0  # Bytes from the start of the match
+    read_uint: bool = False  # Dereference a uint32 at match + offset
+    module_relative: bool = False  # Subtract the module base from the result
+
+    def apply(self, match: int, module_base: int, read_uint: Callable[[int], Optional[int]]) -> Optional[int]:
+        value = match + self.offset
+        if self.read_uint:
+            value = read_uint(value)
+            if value is None:
+                return None
+        return value - module_base if self.module_relative else value
+
+
+@dataclass(frozen=True)
+class Signature:
+    """
+    An AOB pattern compiled once for scanning.
+
+    values/mask hold the pattern bytes with 0x00 under wildcards and 0xFF/0x00 as the
+    mask; they are also kept as little-endian ints so a candidate is verified with a
+    single masked compare instead of byte by byte. Candidates come from bytes.find on
+    the anchor (the longest fixed run); after a failed candidate the search jumps ahead
+    by the wildcard-aware Boyer-Moore-Horspool shift of the window's last byte.
+    """
+
+    name: str
+    pattern: str
+    values: bytes
+    mask: bytes
+    anchor_offset: int
+    anchor: bytes
+    skip: tuple[int, ...]
+    extract: Extract = Extract()
+    _values_int: int = field(default=0, repr=False, compare=False)
+    _mask_int: int = field(default=0, repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, name: str, pattern: str, extract: Optional[Extract] = None) -> "Signature":
+        pattern_bytes = parse_pattern(pattern)
+        if not pattern_bytes:
+            raise ValueError(f"Empty AOB pattern for signature '{name}'.")
+        values = bytes(0 if b is None else b for b in pattern_bytes)
+        mask = bytes(0 if b is None else 0xFF for b in pattern_bytes)
+        runs = _fixed_runs(pattern_bytes)
+        anchor_offset, anchor = max(runs, key=lambda run: len(run[1])) if runs else (0, b"")
+        return cls(
+            name=name,
+            pattern=pattern,
+            values=values,
+            mask=mask,
+            anchor_offset=anchor_offset,
+            anchor=anchor,
+            skip=_horspool_skip(pattern_bytes),
+            extract=extract or Extract(),
+            _values_int=int.from_bytes(values, "little"),
+            _mask_int=int.from_bytes(mask, "little"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def matches(self, data, offset: int = 0) -> bool:
+        """Checks whether the pattern matches data at offset."""
+        window = data[offset : offset + len(self.values)]
+        return len(window) == len(self.values) and int.from_bytes(window, "little") & self._mask_int == self._values_int
+
+
+def _fixed_runs(pattern_bytes: list[Optional[int]]) -> list[tuple[int, bytes]]:
+    """Splits a parsed pattern into (offset, bytes) runs of consecutive non-wildcard bytes."""
+    runs = []
+    start = None
+    for i, value in enumerate(pattern_bytes + [None]):
+        if value is not None and start is None:
+            start = i
+        elif value is None and start is not None:
+            runs.append((start, bytes(pattern_bytes[start:i])))
+            start = None
+    return runs
+
+
+def _horspool_skip(pattern_bytes: list[Optional[int]]) -> tuple[int, ...]:
+    """
+    Horspool shift per value of a window's last byte. A wildcard matches any byte,
+    so no shift may jump past the last wildcard before the final position.
+    """
+    length = len(pattern_bytes)
+    default = length
+    for i, value in enumerate(pattern_bytes[:-1]):
+        if value is None:
+            default = length - 1 - i
+    skip = [default] * 256
+    for i, value in enumerate(pattern_bytes[:-1]):
+        if value is not None and length - 1 - i < skip[value]:
+            skip[value] = length - 1 - i
+    return tuple(skip)
+
+
+def compile_signatures(patterns: dict[str, str], extracts: Optional[dict[str, dict]] = None) -> dict[str, Signature]:
+    """Compiles named patterns, with optional Extract keyword arguments per name."""
+    extracts = extracts or {}
+    return {
+        name: Signature.compile(name, pattern, Extract(**extracts[name]) if name in extracts else None)
+        for name, pattern in patterns.items()
+    }
+
+
+@lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> Signature:
+    return Signature.compile("pattern", pattern)
+
+
+def _as_signature(signature) -> Signature:
+    """Accepts a Signature or an ad-hoc pattern string (compiled once and cached)."""
+    return signature if isinstance(signature, Signature) else _compile_pattern(signature)
+
+
+def _scan_compiled(data, signature: Signature, base_address: int, first_only: bool, start: int = 0, end: Optional[int] = None) -> list[int]:
+    """Scans data[start:end] in place (no copy); base_address is the address of data[0]."""
+    pattern_len = len(signature.values)
+    last_start = (len(data) if end is None else end) - pattern_len
+    if last_start < start:
+        return []
+
+    anchor, anchor_offset = signature.anchor, signature.anchor_offset
+    if not anchor:
+        # All wildcards: every position matches
+        if first_only:
+            return [base_address + start]
+        return [base_address + i for i in range(start, last_start + 1)]
+
+    find = data.find
+    # Shifts of 1 can't beat the next anchor search; skip the lookup for such patterns
+    skip = signature.skip if max(signature.skip) > 1 else None
+    mask_int, values_int = signature._mask_int, signature._values_int
+    # Only the anchor needs checking when it is the whole pattern
+    exact = pattern_len == len(anchor)
+    # The anchor can only sit where the whole pattern still fits in the buffer
+    search_end = last_start + anchor_offset + len(anchor)
+
+    results = []
+    pos = find(anchor, start + anchor_offset, search_end)
+    while pos != -1:
+        match_start = pos - anchor_offset
+        match_end = match_start + pattern_len
+        if exact or int.from_bytes(data[match_start:match_end], "little") & mask_int == values_int:
+            results.append(base_address + match_start)
+            if first_only:
+                break
+            pos = find(anchor, pos + 1, search_end)
+        elif skip is None:
+            pos = find(anchor, pos + 1, search_end)
+        else:
+            # No match can start before the Horspool shift of the window's last byte
+            pos = find(anchor, max(pos + 1, match_start + skip[data[match_end - 1]] + anchor_offset), search_end)
+
+    return results
+
+
+def aob_scan(data, signature, base_address: int = 0, first_only: bool = False) -> list[int]:
+    """
+    Finds every (possibly overlapping) occurrence of a Signature (or pattern string)
+    in a buffer. Returns absolute addresses (base_address + offset) in ascending order.
+    """
+    return _scan_compiled(data, _as_signature(signature), base_address, first_only)
+
+
+def scan_signatures(data, signatures: Iterable[Signature], base_address: int = 0, first_only: bool = False, start: int = 0, end: Optional[int] = None) -> dict[str, list[int]]:
+    """
+    Resolves several compiled signatures against one buffer, so callers read the
+    module once no matter how many signatures they need. Each signature is still its
+    own bytes.find pass over the buffer, so scan time grows linearly with the number
+    of signatures. start/end limit the scan to a window of data without copying it
+    (e.g. one region of a memory-mapped image).
+    """
+    return {signature.name: _scan_compiled(data, signature, base_address, first_only, start, end) for signature in signatures}
+
+
+def max_pattern_length(signatures: Iterable[Signature]) -> int:
+    return max((len(signature) for signature in signatures), default=0)
+
+
+def _searchable(chunk):
+    """Returns an object with .find for a chunk, avoiding a copy when a memoryview spans a whole buffer."""
+    if isinstance(chunk, memoryview):
+        if chunk.obj is not None and chunk.nbytes == len(chunk.obj) and hasattr(chunk.obj, "find"):
+            return chunk.obj
+        return chunk.tobytes()
+    return chunk
+
+
+def _as_bytes(chunk) -> bytes:
+    """Returns a chunk as bytes so it can be sent to a worker process."""
+    data = _searchable(chunk)
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def _merge_chunk_results(results: dict[str, list[int]], chunk_results: dict[str, list[int]], pending: set[str], first_only: bool):
+    for name, matches in chunk_results.items():
+        if name not in pending:
+            continue
+        found = results[name]
+        for match in matches:
+            # Matches inside the overlap were already reported by the previous chunk
+            if not found or match > found[-1]:
+                found.append(match)
+        if first_only and found:
+            pending.discard(name)
+
+
+# --- Worker Pool ---
+# One process pool is kept for the life of the program, so only the first parallel scan
+# pays for starting the workers (reattach rescans reuse them)
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            # Imported here: concurrent.futures.process pulls in multiprocessing, which startup doesn't need
+            from concurrent.futures import ProcessPoolExecutor
+
+            _shutdown_pool()
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            if not _pool_workers:
+                atexit.register(shutdown_pool)
+            _pool_workers = workers
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def shutdown_pool():
+    """Stops the scan worker processes; the next parallel scan starts new ones."""
+    with _pool_lock:
+        _shutdown_pool()
+
+
+def scan_chunks(chunks, signatures: Iterable[Signature], first_only: bool = False, workers: int = 1) -> dict[str, list[int]]:
+    """
+    Resolves compiled signatures over a stream of (address, chunk) pairs.
+
+    Chunks must arrive in ascending address order and overlap by at least the longest
+    signature length minus one (see module_reader.iter_chunks). Matches seen twice in an
+    overlap are reported once. With first_only, the stream is abandoned as soon as
+    every signature has a match.
+
+    With workers > 1 (capped at the CPU count) chunks are scanned on a shared process
+    pool and merged in address order; the result is identical to the serial scan.
+    """
+    signatures = list(signatures)
+    workers = min(workers, os.cpu_count() or 1)
+    if workers > 1:
+        try:
+            pool = _get_pool(workers)
+        except (OSError, NotImplementedError, ImportError) as e:
+            logging.warning("Parallel scan unavailable (%s). Scanning serially.", e)
+        else:
+            try:
+                return _scan_chunks_parallel(pool, chunks, signatures, first_only, workers)
+            except Exception:
+                # A broken pool (e.g. a worker was killed) is replaced on the next scan
+                shutdown_pool()
+                raise
+
+    results: dict[str, list[int]] = {signature.name: [] for signature in signatures}
+    pending = set(results)
+
+    for address, chunk in chunks:
+        data = _searchable(chunk)
+        chunk_results = {
+            signature.name: _scan_compiled(data, signature, address, first_only)
+            for signature in signatures
+            if signature.name in pending
+        }
+        _merge_chunk_results(results, chunk_results, pending, first_only)
+        if first_only and not pending:
+            break
+
+    return results
+
+
+def _scan_chunks_parallel(pool: "ProcessPoolExecutor", chunks, signatures: list[Signature], first_only: bool, workers: int) -> dict[str, list[int]]:
+    results: dict[str, list[int]] = {signature.name: [] for signature in signatures}
+    pending = set(results)
+    chunk_iter = iter(chunks)
+    in_flight = deque()
+
+    def submit_next() -> bool:
+        for address, chunk in chunk_iter:
+            in_flight.append(pool.submit(scan_signatures, _as_bytes(chunk), signatures, address, first_only))
+            return True
+        return False
+
+    # Keep a bounded window of chunks in flight so memory stays proportional to the worker count
+    while len(in_flight) < workers * 2 and submit_next():
+        pass
+
+    while in_flight:
+        _merge_chunk_results(results, in_flight.popleft().result(), pending, first_only)
+        if first_only and not pending:
+            for future in in_flight:
+                future.cancel()
+            break
+        submit_next()
+
+    return results
@@ -0,0 +1,85 @@
+# scheduler.py
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class TickStats:
+    ticks: int = 0
+    overruns: int = 0  # Ticks whose work ran past the next deadline
+    skipped_ticks: int = 0  # Deadlines dropped to catch up after overruns
+    max_overrun_s: float = 0.0
+    total_overrun_s: float = 0.0
+
+    def summary(self) -> str:
+        mean_overrun_ms = self.total_overrun_s / self.overruns * 1000 if self.overruns else 0.0
+        return (
+            f"{self.ticks} ticks, {self.overruns} overruns, {self.skipped_ticks} skipped, "
+            f"max overrun {self.max_overrun_s * 1000:.2f} ms, mean overrun {mean_overrun_ms:.2f} ms"
+        )
+
+
+class TickScheduler:
+    """
+    Fixed-rate scheduler that waits for absolute deadlines on the perf_counter clock,
+    so work time and sleep granularity don't accumulate as drift.
+
+    The wait sleeps until spin_s before the deadline, then busy-waits the rest
+    (spin_s=0 disables spinning). When a tick runs past one or more deadlines they
+    are skipped rather than run back to back, keeping the original tick grid.
+    """
+
+    def __init__(self, interval_s: float, spin_s: float = 0.0):
+        self.interval_s = interval_s
+        self.spin_s = spin_s
+        self.stats = TickStats()
+        self._deadline = time.perf_counter() + interval_s
+
+    def reset(self):
+        """Re-anchors the tick grid to now, e.g. after an out-of-band sleep."""
+        self._deadline = time.perf_counter() + self.interval_s
+
+    def set_interval(self, interval_s: float):
+        if interval_s != self.interval_s:
+            # Re-time the pending tick from its start so a rate change takes effect now;
+            # if that deadline already passed, start a fresh grid instead of reporting an overrun
+            deadline = self._deadline - self.interval_s + interval_s
+            now = time.perf_counter()
+            self._deadline = deadline if deadline > now else now + interval_s
+            self.interval_s = interval_s
+
+    def wait(self, wake: Optional[threading.Event] = None):
+        """
+        Blocks until the current tick's deadline and schedules the next one.
+        If wake is given and gets set during the wait, returns early (clearing it)
+        and re-anchors the tick grid.
+        """
+        stats = self.stats
+        stats.ticks += 1
+        now = time.perf_counter()
+        deadline = self._deadline
+
+        if now >= deadline:
+            overrun = now - deadline
+            missed = int(overrun // self.interval_s)
+            stats.overruns += 1
+            stats.skipped_ticks += missed
+            stats.total_overrun_s += overrun
+            stats.max_overrun_s = max(stats.max_overrun_s, overrun)
+            # Coalesce: start the next tick right away and realign to the grid
+            self._deadline = deadline + (missed + 1) * self.interval_s
+            return
+
+        remaining = deadline - now
+        if remaining > self.spin_s:
+            if wake is None:
+                time.sleep(remaining - self.spin_s)
+            elif wake.wait(remaining - self.spin_s):
+                wake.clear()
+                self.reset()
+                return
+        while time.perf_counter() < deadline:
+            pass
+        self._deadline = deadline + self.interval_s
@@ -0,0 +1,89 @@
+# signature_cache.py
+import hashlib
+import json
+import logging
+import os
+import struct
+from typing import Callable, Optional
+
+PAGE_SIZE = 0x1000
+IMAGE_SCN_MEM_EXECUTE = 0x20000000
+MAX_CACHED_MODULES = 8
+
+
+def module_fingerprint(read_bytes: Callable[[int, int], bytes], module_base: int, size_of_image: int, sample_pages: int = 8) -> Optional[str]:
+    """
+    Builds a cheap identity for a loaded PE image without reading all of it.
+
+    Combines the PE TimeDateStamp, SizeOfImage and a hash of the header page plus
+    a few pages sampled evenly across the first executable section.
+    Returns None if the headers can't be read or parsed.
+    """
+    try:
+        header = read_bytes(module_base, PAGE_SIZE)
+        (e_lfanew,) = struct.unpack_from("<I", header, 0x3C)
+        if header[e_lfanew : e_lfanew + 4] != b"PE\0\0":
+            return None
+        num_sections, timestamp = struct.unpack_from("<HI", header, e_lfanew + 6)
+        (optional_header_size,) = struct.unpack_from("<H", header, e_lfanew + 20)
+
+        digest = hashlib.sha1(header)
+        section_table = e_lfanew + 24 + optional_header_size
+        for i in range(num_sections):
+            entry = section_table + i * 40
+            virtual_size, virtual_address = struct.unpack_from("<II", header, entry + 8)
+            (characteristics,) = struct.unpack_from("<I", header, entry + 36)
+            if characteristics & IMAGE_SCN_MEM_EXECUTE and virtual_size:
+                page_count = max(1, virtual_size // PAGE_SIZE)
+                for n in range(sample_pages):
+                    page = (page_count - 1) * n // max(1, sample_pages - 1)
+                    digest.update(read_bytes(module_base + virtual_address + page * PAGE_SIZE, PAGE_SIZE))
+                break
+
+        return f"{timestamp:08x}-{size_of_image:x}-{digest.hexdigest()[:16]}"
+    except Exception as e:
+        logging.warning("Could not fingerprint module: %s", e)
+        return None
+
+
+class SignatureCache:
+    """On-disk map of module fingerprint -> signature offsets relative to the module base."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict[str, dict[str, int]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable signature cache %s: %s", self.path, e)
+            self._entries = {}
+
+    def lookup(self, fingerprint: str) -> Optional[dict[str, int]]:
+        return self._entries.get(fingerprint)
+
+    def store(self, fingerprint: str, offsets: dict[str, int]):
+        self._entries.pop(fingerprint, None)
+        self._entries[fingerprint] = offsets
+        # Keep only the most recently stored modules
+        while len(self._entries) > MAX_CACHED_MODULES:
+            del self._entries[next(iter(self._entries))]
+        self._save()
+
+    def invalidate(self, fingerprint: str):
+        if self._entries.pop(fingerprint, None) is not None:
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning("Could not write signature cache %s: %s", self.path, e)